@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import logging
+import threading
+from types import TracebackType
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+CANCEL_POLL_INTERVAL_SECONDS = 5.0
+
+
+class ExperimentQueueStateReader(Protocol):
+    def get_experiment_queue_state(self, experiment_id: int) -> tuple[str | None, str | None]:
+        ...
+
+
+class ExperimentCancelWatcher:
+    """Set `event` once the platform marks the experiment `manual_terminated` while its cases run.
+
+    The platform records termination only in `experiments.queue_status`, so a background
+    thread re-reads it every `poll_interval_seconds`; the runner checks `event` before
+    starting each case and before invoking scorers.
+    """
+
+    def __init__(
+        self,
+        db: ExperimentQueueStateReader,
+        experiment_id: int,
+        *,
+        poll_interval_seconds: float = CANCEL_POLL_INTERVAL_SECONDS,
+    ) -> None:
+        self._db = db
+        self._experiment_id = experiment_id
+        self._poll_interval_seconds = poll_interval_seconds
+        self.event = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"cancel-watch-{experiment_id}", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "ExperimentCancelWatcher":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._poll_interval_seconds):
+            try:
+                queue_status, _ = self._db.get_experiment_queue_state(self._experiment_id)
+            except Exception as exc:
+                logger.warning(
+                    "code=E_CANCEL_POLL_FAILED experiment_id=%s err=%s",
+                    self._experiment_id,
+                    exc,
+                )
+                continue
+            if queue_status == "manual_terminated":
+                logger.info("code=EXPERIMENT_CANCEL_OBSERVED experiment_id=%s", self._experiment_id)
+                self.event.set()
+                return
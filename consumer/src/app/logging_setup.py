@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import logging
+import queue
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s%(log_context)s"
+LOG_QUEUE_MAXSIZE = 10000
+
+_LOG_CONTEXT: ContextVar[str] = ContextVar("log_context", default="")
+
+
+@contextmanager
+def log_context(**fields: object) -> Iterator[None]:
+    """Append `key=value` fields to every record logged from the current context."""
+    rendered = "".join(f" {key}={value}" for key, value in fields.items())
+    token = _LOG_CONTEXT.set(_LOG_CONTEXT.get() + rendered)
+    try:
+        yield
+    finally:
+        _LOG_CONTEXT.reset(token)
+
+
+class LogContextFilter(logging.Filter):
+    """Stamp the bound log context on records; must run on the producing thread, before enqueueing."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.log_context = _LOG_CONTEXT.get()
+        return True
+
+
+class DropOldestQueueHandler(QueueHandler):
+    """Enqueue records without blocking; on overload evict the oldest pending record."""
+
+    def __init__(self, log_queue: queue.Queue[logging.LogRecord]) -> None:
+        super().__init__(log_queue)
+        self._bounded = log_queue
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        while True:
+            try:
+                self._bounded.put_nowait(record)
+                return
+            except queue.Full:
+                try:
+                    self._bounded.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+def configure_logging(level: int = logging.INFO, *, maxsize: int = LOG_QUEUE_MAXSIZE) -> QueueListener:
+    """Route root logging through a bounded queue; formatting and stderr writes run on the listener thread.
+
+    Callers own the returned listener and should `stop()` it on shutdown to drain pending records.
+    """
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=maxsize)
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    queue_handler = DropOldestQueueHandler(log_queue)
+    queue_handler.addFilter(LogContextFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    listener.start()
+    return listener
@@ -3,14 +3,18 @@ from __future__ import annotations
 import logging
 
 from infrastructure.config import load_settings
+from .logging_setup import configure_logging
 from .worker import ConsumerWorker
 
 
 def run() -> None:
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
-    settings = load_settings()
-    worker = ConsumerWorker(settings)
-    worker.start()
+    log_listener = configure_logging(logging.INFO)
+    try:
+        settings = load_settings()
+        worker = ConsumerWorker(settings)
+        worker.start()
+    finally:
+        log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -1,19 +1,54 @@
 from __future__ import annotations
 
-import json
 import logging
+import random
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from domain.contracts import CaseExecutionResult
+import orjson
+
+from domain.contracts import ExperimentRunRequested, MessageContractError
 from domain.parser import parse_message
 from infrastructure.config import Settings
 from infrastructure.db_repository import DbRepository
 from infrastructure.locks import MessageLock
-from runtime.inspect_runner import InspectRunner
+from runtime.inspect_runner import CASE_CANCELLED_ERROR, InspectRunner
+from .cancellation import ExperimentCancelWatcher
+from .logging_setup import log_context
+from .status_batcher import CaseStatusBatcher
 
 logger = logging.getLogger(__name__)
 
+PHASE_TO_STATUS: dict[str, str] = {
+    "sandbox_connect": "running",
+    "case_exec": "running",
+    "otel_query": "trajectory",
+}
+FAILED_CASE_LOG_PREVIEW_CHARS = 512
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 8.0
+RETRY_JITTER_SECONDS = 0.25
+# Contract/payload bugs: re-running the whole batch cannot make these succeed.
+NON_RETRYABLE_ERRORS: tuple[type[Exception], ...] = (MessageContractError,)
+# The runner reports contract failures per case; these error codes mark the batch as non-retryable.
+CONTRACT_CASE_ERROR_CODES: tuple[str, ...] = (
+    "E_MESSAGE_CONTRACT",
+    "E_RUNTIME_SPEC_",
+    "E_RUNTIME_COMMAND_TEMPLATE_VARIABLE_NOT_DECLARED",
+)
+
+
+class _ClippedText:
+    """Lazy `%s` argument: the log slice is only materialized if the record is emitted."""
+
+    __slots__ = ("text", "limit")
+
+    def __init__(self, text: str, limit: int) -> None:
+        self.text = text
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return self.text[: self.limit]
+
 
 class MessageProcessor:
     def __init__(self, settings: Settings, runner: InspectRunner, lock: MessageLock, db: DbRepository) -> None:
@@ -23,54 +58,33 @@ class MessageProcessor:
         self.db = db
 
     def handle_raw_message(self, body: bytes) -> None:
-        payload = json.loads(body.decode("utf-8"))
+        payload = orjson.loads(body)
         message = parse_message(payload)
         if message.message_type != "experiment.run.requested":
-            raise ValueError(f"E_UNSUPPORTED_MESSAGE_TYPE: {message.message_type}")
-        logger.info(
-            "code=MESSAGE_RECEIVED message_id=%s experiment_id=%s run_cases=%s",
-            message.message_id,
-            message.experiment.id,
-            len(message.run_cases),
-        )
+            raise MessageContractError(f"E_UNSUPPORTED_MESSAGE_TYPE: {message.message_type}")
+        with log_context(experiment_id=message.experiment.id, message_id=message.message_id):
+            logger.info("code=MESSAGE_RECEIVED run_cases=%s", len(message.run_cases))
 
-        key_suffix = self.lock.build_suffix(message.message_id, body)
-        if self.lock.already_processed(key_suffix):
-            return
-        if not self.lock.acquire_processing(key_suffix):
-            return
+            key_suffix = self.lock.build_suffix(message.message_id, body)
+            if not self.lock.try_claim(key_suffix):
+                return
 
-        try:
-            self._process_message(message)
+            try:
+                self._process_message(message)
+            except Exception:
+                self.lock.release_processing(key_suffix)
+                raise
             self.lock.mark_processed(key_suffix)
-        except Exception:
-            self.lock.release_processing(key_suffix)
-            raise
-        self.lock.release_processing(key_suffix)
 
-    def _process_message(self, message) -> None:
-        experiment_started = time.time()
-        logger.info(
-            "code=EXPERIMENT_EXEC_START experiment_id=%s message_id=%s run_cases=%s",
-            message.experiment.id,
-            message.message_id,
-            len(message.run_cases),
-        )
+    def _process_message(self, message: ExperimentRunRequested) -> None:
+        experiment_started = time.monotonic_ns()
+        logger.info("code=EXPERIMENT_EXEC_START run_cases=%s", len(message.run_cases))
         queue_status, queue_message_id = self.db.get_experiment_queue_state(message.experiment.id)
         if queue_status == "manual_terminated":
-            logger.info(
-                "code=MESSAGE_SKIPPED_MANUAL_TERMINATED message_id=%s experiment_id=%s",
-                message.message_id,
-                message.experiment.id,
-            )
+            logger.info("code=MESSAGE_SKIPPED_MANUAL_TERMINATED")
             return
         if queue_message_id and queue_message_id != message.message_id:
-            logger.info(
-                "code=MESSAGE_SKIPPED_STALE message_id=%s expected_message_id=%s experiment_id=%s",
-                message.message_id,
-                queue_message_id,
-                message.experiment.id,
-            )
+            logger.info("code=MESSAGE_SKIPPED_STALE expected_message_id=%s", queue_message_id)
             return
 
         last_error: Exception | None = None
@@ -78,160 +92,154 @@ class MessageProcessor:
             try:
                 self._execute_cases(message)
                 logger.info(
-                    "code=EXPERIMENT_EXEC_DONE experiment_id=%s message_id=%s elapsed_ms=%s",
-                    message.experiment.id,
-                    message.message_id,
-                    int((time.time() - experiment_started) * 1000),
+                    "code=EXPERIMENT_EXEC_DONE elapsed_ms=%s",
+                    (time.monotonic_ns() - experiment_started) // 1_000_000,
                 )
                 return
             except Exception as exc:
                 last_error = exc
                 logger.warning(
-                    "code=E_RUN_ATTEMPT_FAILED attempt=%d/%d experiment_id=%s elapsed_ms=%s err=%s",
+                    "code=E_RUN_ATTEMPT_FAILED attempt=%d/%d elapsed_ms=%s err=%s",
                     i,
                     self.settings.max_message_retries,
-                    message.experiment.id,
-                    int((time.time() - experiment_started) * 1000),
+                    (time.monotonic_ns() - experiment_started) // 1_000_000,
                     exc,
                 )
-                time.sleep(i * 0.5)
+                if isinstance(exc, NON_RETRYABLE_ERRORS):
+                    raise RuntimeError(f"E_RUN_NON_RETRYABLE: {exc}") from exc
+                if i < self.settings.max_message_retries:
+                    time.sleep(_retry_delay_seconds(i))
         raise RuntimeError(f"E_RUN_RETRIES_EXCEEDED: {last_error}")
 
-    def _execute_cases(self, message) -> None:
-        batch_started = time.time()
+    def _execute_cases(self, message: ExperimentRunRequested) -> None:
+        batch_started = time.monotonic_ns()
         failures = 0
         status_cache: dict[int, str] = {}
         scoring_active: dict[int, int] = {}
-        for rc in message.run_cases:
-            logger.info("code=CASE_EXEC_START run_case_id=%s", rc.run_case_id)
-        run_case_ids = [rc.run_case_id for rc in message.run_cases]
+        run_cases = message.run_cases
+        run_case_count = len(run_cases)
+        run_case_ids = [rc.run_case_id for rc in run_cases]
+        logger.info("code=CASE_EXEC_START_BATCH run_case_ids=%s", run_case_ids)
         self.db.mark_cases_queued(
             experiment_id=message.experiment.id,
             run_case_ids=run_case_ids,
         )
 
-        case_results: dict[int, CaseExecutionResult] = {}
-        run_phase_started = time.time()
+        run_phase_started = time.monotonic_ns()
         logger.info(
-            "code=RUNNER_PHASE_START experiment_id=%s run_cases=%s pool_size=%s",
-            message.experiment.id,
-            len(message.run_cases),
+            "code=RUNNER_PHASE_START run_cases=%s pool_size=%s",
+            run_case_count,
             self.settings.concurrent_cases,
         )
 
+        status_batcher = CaseStatusBatcher(self.db, message.experiment.id)
+
         def progress_callback(run_case_id: int, phase: str) -> None:
             if phase == "score_exec":
-                current = int(scoring_active.get(run_case_id) or 0) + 1
+                current = scoring_active.get(run_case_id, 0) + 1
                 scoring_active[run_case_id] = current
                 if current == 1:
-                    self.db.mark_case_status(
-                        experiment_id=message.experiment.id,
-                        run_case_id=run_case_id,
-                        status="scoring",
-                    )
+                    status_batcher.submit(run_case_id, "scoring")
                     status_cache[run_case_id] = "scoring"
                 return
             if phase == "score_done":
-                current = max(0, int(scoring_active.get(run_case_id) or 0) - 1)
+                current = max(0, scoring_active.get(run_case_id, 0) - 1)
                 scoring_active[run_case_id] = current
                 if current == 0:
-                    self.db.mark_case_status(
-                        experiment_id=message.experiment.id,
-                        run_case_id=run_case_id,
-                        status="trajectory",
-                    )
+                    status_batcher.submit(run_case_id, "trajectory")
                     status_cache[run_case_id] = "trajectory"
                 return
-            mapped_status = self._status_from_phase(phase)
-            if mapped_status is None:
-                return
-            if status_cache.get(run_case_id) == mapped_status:
+            mapped_status = PHASE_TO_STATUS.get(phase)
+            if mapped_status is None or status_cache.get(run_case_id) == mapped_status:
                 return
-            self.db.mark_case_status(
+            status_batcher.submit(run_case_id, mapped_status)
+            status_cache[run_case_id] = mapped_status
+
+        with ExperimentCancelWatcher(self.db, message.experiment.id) as cancel_watcher, status_batcher:
+            case_results = self.runner.run_cases(
+                message,
+                run_cases,
+                progress_callback=progress_callback,
+                cancel_event=cancel_watcher.event,
+            )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "code=RUNNER_PHASE_DONE run_cases=%s elapsed_ms=%s",
+                run_case_count,
+                (time.monotonic_ns() - run_phase_started) // 1_000_000,
+            )
+        if cancel_watcher.event.is_set():
+            # The platform already marked the unfinished run_cases `canceled`; keep those rows untouched
+            # and only persist the cases that finished before the cancel was observed.
+            finished = [
+                (run_case, case_results[run_case.run_case_id])
+                for run_case in run_cases
+                if case_results[run_case.run_case_id].error_message != CASE_CANCELLED_ERROR
+            ]
+            self.db.persist_case_results(
                 experiment_id=message.experiment.id,
-                run_case_id=run_case_id,
-                status=mapped_status,
+                items=[
+                    (res.run_case_id, res, self.runner.runtime_snapshot(message, run_case))
+                    for run_case, res in finished
+                ],
             )
-            status_cache[run_case_id] = mapped_status
+            logger.info(
+                "code=EXPERIMENT_CANCELLED persisted=%s skipped=%s",
+                len(finished),
+                run_case_count - len(finished),
+            )
+            return
 
-        if hasattr(self.runner, "run_cases"):
-            try:
-                case_results = self.runner.run_cases(
-                    message,
-                    message.run_cases,
-                    progress_callback=progress_callback,
-                )
-            except TypeError:
-                case_results = self.runner.run_cases(message, message.run_cases)
-        else:
-            with ThreadPoolExecutor(max_workers=self.settings.concurrent_cases) as pool:
-                futures = []
-                for rc in message.run_cases:
-                    futures.append(pool.submit(self._run_single_case_with_status, message, rc))
-                future_run_case_map = {f: rc for f, rc in zip(futures, message.run_cases)}
-                for future in as_completed(futures):
-                    run_case = future_run_case_map[future]
-                    case_results[run_case.run_case_id] = future.result()
-        logger.info(
-            "code=RUNNER_PHASE_DONE experiment_id=%s run_cases=%s elapsed_ms=%s",
-            message.experiment.id,
-            len(message.run_cases),
-            int((time.time() - run_phase_started) * 1000),
+        ordered_results = [case_results[run_case_id] for run_case_id in run_case_ids]
+        self.db.persist_case_results(
+            experiment_id=message.experiment.id,
+            items=[
+                (res.run_case_id, res, self.runner.runtime_snapshot(message, run_case))
+                for run_case, res in zip(run_cases, ordered_results)
+            ],
         )
 
-        for run_case in message.run_cases:
-            res = case_results[run_case.run_case_id]
-            runtime_snapshot = self.runner.runtime_snapshot(message, run_case)
-            self.db.persist_case_result(
-                experiment_id=message.experiment.id,
-                run_case_id=res.run_case_id,
-                result=res,
-                runtime_snapshot=runtime_snapshot,
-            )
+        for res in ordered_results:
             if res.status != "success":
                 failures += 1
                 logger.error(
                     "code=E_CASE_FAILED run_case_id=%s error=%s logs=%s",
                     res.run_case_id,
                     res.error_message,
-                    res.logs[:512],
+                    _ClippedText(res.logs, FAILED_CASE_LOG_PREVIEW_CHARS),
                 )
-            else:
-                timings = (res.usage or {}).get("timings_ms") if isinstance(res.usage, dict) else None
-                if isinstance(timings, dict):
+            elif logger.isEnabledFor(logging.INFO):
+                timings = res.timings_ms
+                if timings is not None:
                     logger.info(
                         "code=CASE_COMPLETED run_case_id=%s latency_ms=%s docker_start_ms=%s case_exec_ms=%s otel_query_ms=%s scorer_ms=%s",
                         res.run_case_id,
                         res.latency_ms,
-                        timings.get("sandbox_connect", 0),
-                        timings.get("case_exec", 0),
-                        timings.get("otel_query", 0),
-                        timings.get("scorer_total", 0),
+                        timings["sandbox_connect"],
+                        timings["case_exec"],
+                        timings["otel_query"],
+                        timings["scorer_total"],
                     )
                 else:
                     logger.info("code=CASE_COMPLETED run_case_id=%s latency_ms=%s", res.run_case_id, res.latency_ms)
 
         if failures > 0:
-            raise RuntimeError(f"{failures}/{len(message.run_cases)} run cases failed")
-        logger.info(
-            "code=CASE_BATCH_DONE experiment_id=%s run_cases=%s failures=%s elapsed_ms=%s",
-            message.experiment.id,
-            len(message.run_cases),
-            failures,
-            int((time.time() - batch_started) * 1000),
-        )
+            contract_failures = [res for res in ordered_results if res.error_message.startswith(CONTRACT_CASE_ERROR_CODES)]
+            if contract_failures:
+                raise MessageContractError(
+                    f"E_MESSAGE_CONTRACT: {failures}/{run_case_count} run cases failed: {contract_failures[0].error_message}"
+                )
+            raise RuntimeError(f"{failures}/{run_case_count} run cases failed")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "code=CASE_BATCH_DONE run_cases=%s failures=%s elapsed_ms=%s",
+                run_case_count,
+                failures,
+                (time.monotonic_ns() - batch_started) // 1_000_000,
+            )
 
-    def _run_single_case_with_status(self, message, run_case) -> CaseExecutionResult:
-        self.db.mark_case_status(
-            experiment_id=message.experiment.id,
-            run_case_id=run_case.run_case_id,
-            status="running",
-        )
-        return self.runner.run_case(message, run_case)
-
-    def _status_from_phase(self, phase: str) -> str | None:
-        if phase in {"sandbox_connect", "case_exec"}:
-            return "running"
-        if phase == "otel_query":
-            return "trajectory"
-        return None
+
+def _retry_delay_seconds(attempt: int) -> float:
+    """Capped exponential backoff plus jitter so redelivered messages do not retry in lockstep."""
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+    return delay + random.uniform(0, RETRY_JITTER_SECONDS)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from types import TracebackType
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+# Each flush also refreshes the experiment's aggregate status, so this bounds that to one per window.
+STATUS_FLUSH_INTERVAL_SECONDS = 0.5
+STATUS_FLUSH_MAX_BATCH = 64
+
+
+class CaseStatusWriter(Protocol):
+    def mark_case_statuses(self, *, experiment_id: int, updates: list[tuple[int, str]]) -> None:
+        ...
+
+
+class CaseStatusBatcher:
+    """Coalesce run_case status transitions of one experiment into bulk DB writes.
+
+    Progress callbacks fire from inside the inspect event loop, so `submit` only
+    enqueues; a background thread flushes every `flush_interval_seconds` or as soon
+    as `max_batch` updates are pending. Updates keep their submission order.
+    Progress statuses are advisory (the final result persist overwrites them), so a
+    failed flush is logged and never fails the batch.
+    """
+
+    def __init__(
+        self,
+        db: CaseStatusWriter,
+        experiment_id: int,
+        *,
+        flush_interval_seconds: float = STATUS_FLUSH_INTERVAL_SECONDS,
+        max_batch: int = STATUS_FLUSH_MAX_BATCH,
+    ) -> None:
+        self._db = db
+        self._experiment_id = experiment_id
+        self._flush_interval_seconds = flush_interval_seconds
+        self._max_batch = max(1, max_batch)
+        self._pending: deque[tuple[int, str]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"case-status-{experiment_id}", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "CaseStatusBatcher":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def submit(self, run_case_id: int, status: str) -> None:
+        with self._cond:
+            self._pending.append((run_case_id, status))
+            if len(self._pending) >= self._max_batch:
+                self._cond.notify()
+
+    def close(self) -> None:
+        """Flush everything still pending and stop the flush thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self._max_batch:
+                    self._cond.wait(self._flush_interval_seconds)
+                batch = list(self._pending)
+                self._pending.clear()
+                closed = self._closed
+            if batch:
+                self._flush(batch)
+            if closed:
+                return
+
+    def _flush(self, batch: list[tuple[int, str]]) -> None:
+        try:
+            self._db.mark_case_statuses(experiment_id=self._experiment_id, updates=batch)
+        except Exception as exc:
+            logger.error(
+                "code=E_CASE_STATUS_FLUSH_FAILED experiment_id=%s updates=%s err=%s",
+                self._experiment_id,
+                len(batch),
+                exc,
+            )
@@ -7,6 +7,7 @@ from infrastructure.db_repository import DbRepository
 from infrastructure.docker_runner import DockerRunner
 from infrastructure.locks import RedisMessageLock
 from infrastructure.mq_consumer import RabbitMqConsumer
+from infrastructure.trace_repository import TraceRepository
 from runtime.inspect_runner import InspectRunner
 from .message_processor import MessageProcessor
 
@@ -25,10 +26,11 @@ class ConsumerWorker:
             run_timeout_seconds=settings.docker_run_timeout_seconds,
             inspect_timeout_seconds=settings.docker_inspect_timeout_seconds,
         )
-        inspect_runner = InspectRunner(runner, settings=settings)
+        trace_repo = TraceRepository.from_settings(settings)
+        self.runner = InspectRunner(runner, settings=settings, trace_repo=trace_repo)
         lock = RedisMessageLock.from_settings(settings)
-        db = DbRepository.from_settings(settings)
-        self.processor = MessageProcessor(settings=settings, runner=inspect_runner, lock=lock, db=db)
+        self.db = DbRepository.from_settings(settings)
+        self.processor = MessageProcessor(settings=settings, runner=self.runner, lock=lock, db=self.db)
         self.consumer = RabbitMqConsumer(settings)
 
     def start(self) -> None:
@@ -37,4 +39,11 @@ class ConsumerWorker:
             self.settings.rabbitmq_experiment_queue,
             self.settings.concurrent_cases,
         )
-        self.consumer.start(self.processor.handle_raw_message)
+        try:
+            self.consumer.start(self.processor.handle_raw_message)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.runner.close()
+        self.db.close()
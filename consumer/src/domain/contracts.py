@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, TypedDict
 
 
-@dataclass
+class MessageContractError(ValueError):
+    """The message payload violates the producer contract; re-running it cannot succeed."""
+
+
+@dataclass(slots=True)
 class MockMatch:
     methods: list[str] = field(default_factory=list)
     url: str | None = None
@@ -14,7 +18,7 @@ class MockMatch:
     path_regex: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MockResponse:
     type: str = "json"  # json | text | python
     status: int = 200
@@ -24,20 +28,20 @@ class MockResponse:
     python_code: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class MockRule:
     name: str = ""
     match: MockMatch = field(default_factory=MockMatch)
     response: MockResponse = field(default_factory=MockResponse)
 
 
-@dataclass
+@dataclass(slots=True)
 class MockConfig:
     passthrough: bool = True
     rules: list[MockRule] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class RunCaseInput:
     run_case_id: int
     data_item_id: int
@@ -50,7 +54,7 @@ class RunCaseInput:
     mock_config: MockConfig | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentRef:
     id: int
     name: str
@@ -59,19 +63,19 @@ class AgentRef:
     runtime_spec_json: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ExperimentRef:
     id: int
     triggered_by: str
 
 
-@dataclass
+@dataclass(slots=True)
 class DatasetRef:
     id: int
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ExperimentRunRequested:
     message_type: str
     schema_version: str
@@ -86,13 +90,32 @@ class ExperimentRunRequested:
     consumer_hints: dict[str, Any]
 
 
-@dataclass
+class CaseTimingsMs(TypedDict):
+    sandbox_connect: int
+    case_exec: int
+    scorer_total: int
+    otel_query: int
+    total: int
+    scorer_breakdown: dict[str, int]
+
+
+@dataclass(slots=True)
+class ScorerResult:
+    scorer_key: str
+    score: float
+    reason: str = ""
+    evaluator_id: int = 0
+    evaluator_name: str = ""
+    raw_result: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
 class CaseExecutionResult:
     run_case_id: int
     status: str
     trajectory: Any = None
     output: Any = None
-    scorer_results: list[dict[str, Any]] = field(default_factory=list)
+    scorer_results: list[ScorerResult] = field(default_factory=list)
     logs: str = ""
     error_message: str = ""
     exit_code: int = 0
@@ -104,3 +127,4 @@ class CaseExecutionResult:
     inspect_eval_id: str = ""
     inspect_sample_id: str = ""
     usage: dict[str, Any] = field(default_factory=dict)
+    timings_ms: CaseTimingsMs | None = None
@@ -1,15 +1,36 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from operator import itemgetter
 from typing import Any
 
+_KEY_ATTRIBUTE_ORDER: tuple[str, ...] = (
+    "tool.name",
+    "tool",
+    "model",
+    "model.name",
+    "http.method",
+    "http.url",
+    "http.status_code",
+    "db.system",
+    "db.operation",
+    "benchmark.run_case_id",
+    "benchmark.data_item_id",
+    "query",
+    "results",
+    "path",
+    "content_preview",
+    "final_answer",
+)
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
 
 def map_spans_to_trajectory(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    ordered = sorted(spans, key=_span_sort_key)
+    keyed = [(_span_sort_key(span), span) for span in spans]
+    keyed.sort(key=itemgetter(0))
     trajectory: list[dict[str, Any]] = []
-    for idx, span in enumerate(ordered, start=1):
-        start_ms = _to_epoch_ms(span.get("start_time") or span.get("created_at"))
-        end_ms = _to_epoch_ms(span.get("end_time")) or start_ms
+    for idx, ((start_ms, end_ms, _), span) in enumerate(keyed, start=1):
+        end_ms = end_ms or start_ms
         latency_ms = max(0, end_ms - start_ms)
         raw = span.get("raw")
         raw_obj = raw if isinstance(raw, dict) else {}
@@ -32,10 +53,10 @@ def map_spans_to_trajectory(spans: list[dict[str, Any]]) -> list[dict[str, Any]]
 
 
 def map_logs_to_trajectory(logs: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    ordered = sorted(logs, key=_log_sort_key)
+    keyed = [(_log_sort_key(log), log) for log in logs]
+    keyed.sort(key=itemgetter(0))
     trajectory: list[dict[str, Any]] = []
-    for idx, log in enumerate(ordered, start=1):
-        event_ms = _to_epoch_ms(log.get("event_time") or log.get("observed_time") or log.get("created_at"))
+    for idx, ((event_ms, _, _), log) in enumerate(keyed, start=1):
         body = _log_body(log)
         picked_attributes = _pick_key_attributes(log.get("attributes"))
         event_attributes = [
@@ -99,6 +120,9 @@ def _to_epoch_ms(value: Any) -> int:
         text = value.strip()
         if not text:
             return 0
+        fast_ms = _utc_iso_to_epoch_ms(text)
+        if fast_ms is not None:
+            return fast_ms
         if text.endswith("Z"):
             text = text[:-1] + "+00:00"
         try:
@@ -108,32 +132,47 @@ def _to_epoch_ms(value: Any) -> int:
     return 0
 
 
+def _utc_iso_to_epoch_ms(text: str) -> int | None:
+    """Parse `YYYY-MM-DDTHH:MM:SS[.fraction]Z` without building a datetime; None for any other layout."""
+    size = len(text)
+    if size < 20 or text[-1] != "Z" or text[4] != "-" or text[7] != "-" or text[10] != "T":
+        return None
+    if text[13] != ":" or text[16] != ":" or (size > 20 and text[19] != "."):
+        return None
+    fraction = text[20:-1]
+    if fraction and not fraction.isdigit():
+        return None
+    try:
+        year = int(text[0:4])
+        month = int(text[5:7])
+        day = int(text[8:10])
+        hour = int(text[11:13])
+        minute = int(text[14:16])
+        second = int(text[17:19])
+    except ValueError:
+        return None
+    if not (1 <= month <= 12 and 1 <= day <= _DAYS_IN_MONTH[month] and hour < 24 and minute < 60 and second < 60):
+        return None
+    if month == 2 and day == 29 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+        return None
+    millis = int(fraction[:3].ljust(3, "0")) if fraction else 0
+    return (((_days_from_civil(year, month, day) * 24 + hour) * 60 + minute) * 60 + second) * 1000 + millis
+
+
+def _days_from_civil(year: int, month: int, day: int) -> int:
+    # Howard Hinnant's days_from_civil: days since 1970-01-01 in the proleptic Gregorian calendar.
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
 def _pick_key_attributes(attributes: Any) -> dict[str, Any]:
     if not isinstance(attributes, dict):
         return {}
-    keys = (
-        "tool.name",
-        "tool",
-        "model",
-        "model.name",
-        "http.method",
-        "http.url",
-        "http.status_code",
-        "db.system",
-        "db.operation",
-        "benchmark.run_case_id",
-        "benchmark.data_item_id",
-        "query",
-        "results",
-        "path",
-        "content_preview",
-        "final_answer",
-    )
-    picked: dict[str, Any] = {}
-    for key in keys:
-        if key in attributes:
-            picked[key] = attributes[key]
-    return picked
+    return {key: attributes[key] for key in _KEY_ATTRIBUTE_ORDER if key in attributes}
 
 
 def _log_body(log: dict[str, Any]) -> Any:
@@ -2,6 +2,11 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from urllib.parse import quote
+
+_PULL_POLICIES = frozenset({"always", "if-not-present", "never"})
+_DATABASE_ENGINES = frozenset({"postgres", "mysql"})
 
 
 @dataclass(frozen=True)
@@ -47,15 +52,23 @@ class Settings:
     evaluator_retry_backoff_seconds: float
     scorer_hard_timeout_seconds: int
 
-    @property
+    @cached_property
     def rabbitmq_url(self) -> str:
-        from urllib.parse import quote
-
         user = quote(self.rabbitmq_user, safe="")
         password = quote(self.rabbitmq_password, safe="")
         vhost = "%2F" if self.rabbitmq_vhost == "/" else quote(self.rabbitmq_vhost, safe="")
         return f"amqp://{user}:{password}@{self.rabbitmq_host}:{self.rabbitmq_port}/{vhost}"
 
+    @cached_property
+    def postgres_dsn(self) -> str:
+        return (
+            f"host={self.postgres_server} "
+            f"port={self.postgres_port} "
+            f"user={self.postgres_user} "
+            f"password={self.postgres_password or ''} "
+            f"dbname={self.postgres_db}"
+        )
+
 
 def _must_env(name: str) -> str:
     v = os.getenv(name)
@@ -86,15 +99,16 @@ def _as_float(name: str, default: float) -> float:
 
 def _as_pull_policy(name: str, default: str) -> str:
     raw = (os.getenv(name) or default).strip().lower()
-    allowed = {"always", "if-not-present", "never"}
-    if raw not in allowed:
-        raise ValueError(f"Invalid pull policy env {name}={raw!r}, expected one of {sorted(allowed)}")
+    if raw not in _PULL_POLICIES:
+        raise ValueError(f"Invalid pull policy env {name}={raw!r}, expected one of {sorted(_PULL_POLICIES)}")
     return raw
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
+    """Read settings from the environment once per process; use `load_settings.cache_clear()` to re-read."""
     database_engine = (os.getenv("DATEBASE_ENGINE") or os.getenv("DATABASE_ENGINE") or "postgres").strip().lower()
-    if database_engine not in {"postgres", "mysql"}:
+    if database_engine not in _DATABASE_ENGINES:
         raise ValueError(f"Invalid DATABASE_ENGINE={database_engine!r}, expected postgres/mysql")
 
     return Settings(
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_MAX_IDLE = 4
+DB_POOL_MAX_IDLE_SECONDS = 60.0
+
+
+class ConnectionPool:
+    """Reuse DB-API connections across calls instead of reconnecting per statement batch.
+
+    Connections are opened on demand, so concurrent callers never block on the pool;
+    at most `max_idle` are kept for reuse and any idle longer than `max_idle_seconds`
+    is closed rather than handed out, so server-side idle timeouts do not surface as
+    errors. Idle connections the driver already reports as closed or broken are
+    dropped too. A connection whose block raised is closed, never returned.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        name: str,
+        max_idle: int = DB_POOL_MAX_IDLE,
+        max_idle_seconds: float = DB_POOL_MAX_IDLE_SECONDS,
+    ) -> None:
+        self._connect = connect
+        self._name = name
+        self._max_idle = max(0, max_idle)
+        self._max_idle_seconds = max_idle_seconds
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Yield a connection; on normal exit commit so reads never pin an old snapshot, then keep it."""
+        conn = self._checkout()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            _close_quietly(conn, self._name)
+            raise
+        self._checkin(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            _close_quietly(conn, self._name)
+
+    def _checkout(self) -> Any:
+        now = time.monotonic()
+        stale: list[Any] = []
+        conn: Any = None
+        with self._lock:
+            while self._idle:
+                candidate, idle_since = self._idle.pop()
+                if now - idle_since <= self._max_idle_seconds and _is_open(candidate):
+                    conn = candidate
+                    break
+                stale.append(candidate)
+        for old in stale:
+            _close_quietly(old, self._name)
+        if conn is not None:
+            return conn
+        return self._connect()
+
+    def _checkin(self, conn: Any) -> None:
+        with self._lock:
+            if len(self._idle) < self._max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        _close_quietly(conn, self._name)
+
+
+def _is_open(conn: Any) -> bool:
+    """Driver-side liveness flags: psycopg sets `closed`/`broken`, PyMySQL clears `open`."""
+    if getattr(conn, "closed", False) or getattr(conn, "broken", False):
+        return False
+    return bool(getattr(conn, "open", True))
+
+
+def _close_quietly(conn: Any, name: str) -> None:
+    try:
+        conn.close()
+    except Exception as exc:
+        logger.warning("code=E_DB_POOL_CLOSE_FAILED pool=%s err=%s", name, exc)
@@ -1,26 +1,153 @@
 from __future__ import annotations
 
-import json
 import logging
-import os
-import subprocess
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from typing import Any
 
-from domain.contracts import CaseExecutionResult
+import orjson
+
+try:
+    import psycopg  # type: ignore
+    from psycopg.types.json import Jsonb  # type: ignore
+except ImportError:
+    psycopg = None
+    Jsonb = None
+try:
+    import pymysql  # type: ignore
+except ImportError:
+    pymysql = None
+
+from domain.contracts import CaseExecutionResult, ScorerResult
 from .config import Settings
+from .db_pool import ConnectionPool
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# Status refresh fragments; each counts subquery takes experiment_id.
+_EXPERIMENT_CASE_COUNTS_POSTGRES_SQL = """
+SELECT
+  COUNT(*) AS total_count,
+  COUNT(*) FILTER (WHERE status IN ('running','trajectory','scoring')) AS running_count,
+  COUNT(*) FILTER (WHERE status IN ('pending','queued')) AS pending_count,
+  COUNT(*) FILTER (WHERE status = 'success') AS success_count,
+  COUNT(*) FILTER (WHERE status IN ('failed', 'timeout')) AS failed_count
+FROM run_cases
+WHERE experiment_id = %s AND is_latest = TRUE
+"""
+_EXPERIMENT_CASE_COUNTS_MYSQL_SQL = """
+SELECT
+  COUNT(*) AS total_count,
+  COALESCE(SUM(CASE WHEN status IN ('running','trajectory','scoring') THEN 1 ELSE 0 END), 0) AS running_count,
+  COALESCE(SUM(CASE WHEN status IN ('pending','queued') THEN 1 ELSE 0 END), 0) AS pending_count,
+  COALESCE(SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END), 0) AS success_count,
+  COALESCE(SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END), 0) AS failed_count
+FROM run_cases
+WHERE experiment_id = %s AND is_latest = TRUE
+"""
+_EXPERIMENT_RUN_STATUS_SQL = """
+CASE
+  WHEN total_count = 0 THEN 'idle'
+  WHEN running_count > 0 OR pending_count > 0 THEN 'consuming'
+  WHEN failed_count = 0 THEN 'done'
+  WHEN success_count = 0 THEN 'failed'
+  ELSE 'done'
+END
+"""
+_REFRESH_EXPERIMENT_STATUS_POSTGRES_SQL = f"""
+WITH counts AS (
+  {_EXPERIMENT_CASE_COUNTS_POSTGRES_SQL}
+),
+status AS (
+  SELECT {_EXPERIMENT_RUN_STATUS_SQL} AS run_status FROM counts
+)
+UPDATE experiments AS e
+   SET queue_status = CASE WHEN e.queue_status = 'test_case' THEN 'test_case' ELSE s.run_status END,
+       started_at = CASE WHEN s.run_status = 'consuming' AND e.started_at IS NULL THEN CURRENT_TIMESTAMP ELSE e.started_at END,
+       finished_at = CASE WHEN s.run_status IN ('done', 'failed') THEN CURRENT_TIMESTAMP ELSE e.finished_at END,
+       updated_at = CURRENT_TIMESTAMP
+  FROM status AS s
+ WHERE e.id = %s
+   AND e.queue_status IS DISTINCT FROM 'manual_terminated'
+"""
+_REFRESH_EXPERIMENT_STATUS_MYSQL_SQL = f"""
+UPDATE experiments AS e
+  JOIN (
+    SELECT {_EXPERIMENT_RUN_STATUS_SQL} AS run_status
+      FROM (
+        {_EXPERIMENT_CASE_COUNTS_MYSQL_SQL}
+      ) AS counts
+  ) AS s
+   SET e.queue_status = IF(e.queue_status = 'test_case', 'test_case', s.run_status),
+       e.started_at = IF(s.run_status = 'consuming' AND e.started_at IS NULL, CURRENT_TIMESTAMP, e.started_at),
+       e.finished_at = IF(s.run_status IN ('done', 'failed'), CURRENT_TIMESTAMP, e.finished_at),
+       e.updated_at = CURRENT_TIMESTAMP
+ WHERE e.id = %s
+   AND (e.queue_status IS NULL OR e.queue_status <> 'manual_terminated')
+"""
+
+# Per-case persist statements on postgres. Pooled connections keep them prepared server-side:
+# the single-row statements are prepared on first use, executemany hits psycopg's auto-prepare.
+# JSON parameters are bound as Jsonb (see _jsonb_param), so no ::jsonb casts are needed.
+_UPDATE_RUN_CASE_RESULT_POSTGRES_SQL = """
+UPDATE run_cases
+   SET status = %s,
+       agent_trajectory = %s,
+       agent_output = %s,
+       latency_ms = %s,
+       logs = %s,
+       error_message = %s,
+       runtime_snapshot_json = %s,
+       inspect_eval_id = %s,
+       inspect_sample_id = %s,
+       usage_json = %s,
+       final_score = COALESCE(%s, final_score),
+       finished_at = CURRENT_TIMESTAMP,
+       updated_at = CURRENT_TIMESTAMP
+ WHERE id = %s
+"""
+# Case status transitions keyed by (guarded by allowed_from, sets started_at); each shape is prepared once.
+_UPDATE_CASE_STATUS_POSTGRES_SQL: dict[tuple[bool, bool], str] = {
+    (guarded, set_started_at): f"""
+UPDATE run_cases
+   SET status = %s{", started_at = COALESCE(started_at, CURRENT_TIMESTAMP)" if set_started_at else ""},
+       updated_at = CURRENT_TIMESTAMP
+ WHERE experiment_id = %s
+   AND id = ANY(%s){" AND status = ANY(%s)" if guarded else ""}
+"""
+    for guarded in (False, True)
+    for set_started_at in (False, True)
+}
+_DELETE_RUN_CASE_SCORES_POSTGRES_SQL = "DELETE FROM run_case_scores WHERE run_case_id = ANY(%s)"
+_DELETE_EVALUATE_RESULTS_POSTGRES_SQL = "DELETE FROM evaluate_results WHERE run_case_id = ANY(%s)"
+_INSERT_RUN_CASE_SCORE_POSTGRES_SQL = """
+INSERT INTO run_case_scores(run_case_id, scorer_key, score, reason, raw_result_json)
+VALUES (%s, %s, %s, %s, %s)
+"""
+_INSERT_EVALUATE_RESULT_POSTGRES_SQL = """
+INSERT INTO evaluate_results(run_case_id, evaluator_id, score, reason, raw_result)
+VALUES (%s, %s, %s, %s, %s)
+"""
+
+
+@dataclass(slots=True)
 class DbRepository:
     settings: Settings
+    _postgres_pool: ConnectionPool = field(init=False, repr=False)
+    _mysql_pool: ConnectionPool = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._postgres_pool = ConnectionPool(self._connect_postgres, name="postgres")
+        self._mysql_pool = ConnectionPool(self._connect_mysql, name="mysql")
 
     @classmethod
     def from_settings(cls, settings: Settings) -> "DbRepository":
         return cls(settings=settings)
 
+    def close(self) -> None:
+        self._postgres_pool.close()
+        self._mysql_pool.close()
+
     def persist_case_result(
         self,
         *,
@@ -29,20 +156,21 @@ class DbRepository:
         result: CaseExecutionResult,
         runtime_snapshot: dict[str, Any],
     ) -> None:
+        self.persist_case_results(experiment_id=experiment_id, items=[(run_case_id, result, runtime_snapshot)])
+
+    def persist_case_results(
+        self,
+        *,
+        experiment_id: int,
+        items: list[tuple[int, CaseExecutionResult, dict[str, Any]]],
+    ) -> None:
+        """Persist (run_case_id, result, runtime_snapshot) items in one transaction with a single status refresh."""
+        if not items:
+            return
         if self.settings.database_engine == "postgres":
-            self._persist_case_result_postgres(
-                experiment_id=experiment_id,
-                run_case_id=run_case_id,
-                result=result,
-                runtime_snapshot=runtime_snapshot,
-            )
+            self._persist_case_results_postgres(experiment_id=experiment_id, items=items)
             return
-        self._persist_case_result_mysql(
-            experiment_id=experiment_id,
-            run_case_id=run_case_id,
-            result=result,
-            runtime_snapshot=runtime_snapshot,
-        )
+        self._persist_case_results_mysql(experiment_id=experiment_id, items=items)
 
     def get_experiment_queue_state(self, experiment_id: int) -> tuple[str | None, str | None]:
         if self.settings.database_engine == "postgres":
@@ -72,28 +200,44 @@ class DbRepository:
         run_case_id: int,
         status: str,
     ) -> None:
+        self.mark_case_statuses(experiment_id=experiment_id, updates=[(run_case_id, status)])
+
+    def mark_case_statuses(self, *, experiment_id: int, updates: list[tuple[int, str]]) -> None:
+        """Apply ordered (run_case_id, status) transitions in one transaction with a single status refresh."""
+        if not updates:
+            return
         if self.settings.database_engine == "postgres":
-            self._mark_case_status_postgres(experiment_id=experiment_id, run_case_id=run_case_id, status=status)
+            self._mark_case_statuses_postgres(experiment_id=experiment_id, updates=updates)
             return
-        self._mark_case_status_mysql(experiment_id=experiment_id, run_case_id=run_case_id, status=status)
+        self._mark_case_statuses_mysql(experiment_id=experiment_id, updates=updates)
 
-    def _get_experiment_queue_state_postgres(self, experiment_id: int) -> tuple[str | None, str | None]:
-        try:
-            import psycopg  # type: ignore
-        except Exception as exc:
-            raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres persistence") from exc
+    def _connect_postgres(self) -> Any:
+        if psycopg is None:
+            raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres persistence")
 
         if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
             raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
 
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
+        return psycopg.connect(self.settings.postgres_dsn)
+
+    def _connect_mysql(self) -> Any:
+        if pymysql is None:
+            raise RuntimeError("E_DB_DRIVER_MISSING: install pymysql for mysql persistence")
+
+        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
+            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
+
+        return pymysql.connect(
+            host=self.settings.mysql_server,
+            port=self.settings.mysql_port,
+            user=self.settings.mysql_user,
+            password=self.settings.mysql_password or "",
+            database=self.settings.mysql_db,
+            autocommit=False,
         )
-        with psycopg.connect(dsn) as conn:
+
+    def _get_experiment_queue_state_postgres(self, experiment_id: int) -> tuple[str | None, str | None]:
+        with self._postgres_pool.connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -112,23 +256,7 @@ class DbRepository:
         return queue_status, queue_message_id
 
     def _get_experiment_queue_state_mysql(self, experiment_id: int) -> tuple[str | None, str | None]:
-        try:
-            import pymysql  # type: ignore
-        except Exception as exc:
-            raise RuntimeError("E_DB_DRIVER_MISSING: install pymysql for mysql persistence") from exc
-
-        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
-
-        conn = pymysql.connect(
-            host=self.settings.mysql_server,
-            port=self.settings.mysql_port,
-            user=self.settings.mysql_user,
-            password=self.settings.mysql_password or "",
-            database=self.settings.mysql_db,
-            autocommit=True,
-        )
-        try:
+        with self._mysql_pool.connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -140,108 +268,47 @@ class DbRepository:
                     (experiment_id,),
                 )
                 row = cur.fetchone()
-        finally:
-            conn.close()
         if not row:
             return None, None
         queue_status = str(row[0]) if row[0] is not None else None
         queue_message_id = str(row[1]) if row[1] is not None else None
         return queue_status, queue_message_id
 
-    def _persist_case_result_postgres(
+    def _persist_case_results_postgres(
         self,
         *,
         experiment_id: int,
-        run_case_id: int,
-        result: CaseExecutionResult,
-        runtime_snapshot: dict[str, Any],
+        items: list[tuple[int, CaseExecutionResult, dict[str, Any]]],
     ) -> None:
-        try:
-            import psycopg  # type: ignore
-        except Exception as exc:
-            raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres persistence") from exc
-
-        if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
-
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
-        )
-        with psycopg.connect(dsn) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    UPDATE run_cases
-                       SET status = %s,
-                           agent_trajectory = %s::jsonb,
-                           agent_output = %s::jsonb,
-                           latency_ms = %s,
-                           logs = %s,
-                           error_message = %s,
-                           runtime_snapshot_json = %s::jsonb,
-                           inspect_eval_id = %s,
-                           inspect_sample_id = %s,
-                           usage_json = %s::jsonb,
-                           finished_at = CURRENT_TIMESTAMP,
-                           updated_at = CURRENT_TIMESTAMP
-                     WHERE id = %s
-                    """,
-                    (
-                        result.status,
-                        json.dumps(result.trajectory) if result.trajectory is not None else None,
-                        json.dumps(result.output) if result.output is not None else None,
-                        result.latency_ms,
-                        result.logs,
-                        result.error_message or None,
-                        json.dumps(runtime_snapshot),
-                        result.inspect_eval_id or None,
-                        result.inspect_sample_id or None,
-                        json.dumps(result.usage),
-                        run_case_id,
-                    ),
-                )
-                cur.execute("DELETE FROM run_case_scores WHERE run_case_id = %s", (run_case_id,))
-                cur.execute("DELETE FROM evaluate_results WHERE run_case_id = %s", (run_case_id,))
-                for scorer in result.scorer_results:
-                    evaluator_id = int(scorer.get("evaluator_id") or 0)
-                    cur.execute(
-                        """
-                        INSERT INTO run_case_scores(run_case_id, scorer_key, score, reason, raw_result_json)
-                        VALUES (%s, %s, %s, %s, %s::jsonb)
-                        """,
-                        (
-                            run_case_id,
-                            str(scorer.get("scorer_key", "unknown")),
-                            float(scorer.get("score", 0.0)),
-                            str(scorer.get("reason", "")),
-                            json.dumps(scorer.get("raw_result", {})),
-                        ),
-                    )
-                    if evaluator_id > 0:
-                        cur.execute(
-                            """
-                            INSERT INTO evaluate_results(run_case_id, evaluator_id, score, reason, raw_result)
-                            VALUES (%s, %s, %s, %s, %s::jsonb)
-                            """,
-                            (
-                                run_case_id,
-                                evaluator_id,
-                                float(scorer.get("score", 0.0)),
-                                str(scorer.get("reason", "")),
-                                json.dumps(scorer.get("raw_result", {})),
-                            ),
-                        )
-                if result.scorer_results:
-                    cur.execute(
-                        "UPDATE run_cases SET final_score = (SELECT AVG(score) FROM run_case_scores WHERE run_case_id = %s) WHERE id = %s",
-                        (run_case_id, run_case_id),
-                    )
+        with self._postgres_pool.connection() as conn:
+            with conn.pipeline(), conn.cursor() as cur:
+                self._write_case_results_postgres(cur, items)
                 self._refresh_experiment_status_postgres(cur, experiment_id)
-            conn.commit()
+
+    def _write_case_results_postgres(
+        self,
+        cur: Any,
+        items: list[tuple[int, CaseExecutionResult, dict[str, Any]]],
+    ) -> None:
+        """Update each run_case, then replace the batch's scores with one DELETE and one insert per table."""
+        score_rows: list[_ScoreRow] = []
+        evaluator_rows: list[_EvaluatorRow] = []
+        for run_case_id, result, runtime_snapshot in items:
+            case_score_rows, case_evaluator_rows = _scorer_rows(run_case_id, result.scorer_results, _jsonb_param)
+            cur.execute(
+                _UPDATE_RUN_CASE_RESULT_POSTGRES_SQL,
+                _run_case_update_params(run_case_id, result, runtime_snapshot, case_score_rows, _jsonb_param),
+                prepare=True,
+            )
+            score_rows.extend(case_score_rows)
+            evaluator_rows.extend(case_evaluator_rows)
+        run_case_ids = [run_case_id for run_case_id, _, _ in items]
+        cur.execute(_DELETE_RUN_CASE_SCORES_POSTGRES_SQL, (run_case_ids,), prepare=True)
+        cur.execute(_DELETE_EVALUATE_RESULTS_POSTGRES_SQL, (run_case_ids,), prepare=True)
+        if score_rows:
+            cur.executemany(_INSERT_RUN_CASE_SCORE_POSTGRES_SQL, score_rows)
+        if evaluator_rows:
+            cur.executemany(_INSERT_EVALUATE_RESULT_POSTGRES_SQL, evaluator_rows)
 
     def _mark_cases_running_postgres(self, *, experiment_id: int, run_case_ids: list[int]) -> None:
         self._update_case_status_postgres(
@@ -260,23 +327,21 @@ class DbRepository:
             allowed_from=["pending"],
         )
 
-    def _mark_case_status_postgres(self, *, experiment_id: int, run_case_id: int, status: str) -> None:
-        allowed_from: list[str] | None = None
-        set_started_at = False
-        if status == "running":
-            allowed_from = ["pending", "queued", "trajectory"]
-            set_started_at = True
-        elif status == "trajectory":
-            allowed_from = ["running", "scoring"]
-        elif status == "scoring":
-            allowed_from = ["running", "trajectory"]
-        self._update_case_status_postgres(
-            experiment_id=experiment_id,
-            run_case_ids=[run_case_id],
-            status=status,
-            allowed_from=allowed_from,
-            set_started_at=set_started_at,
-        )
+    def _mark_case_statuses_postgres(self, *, experiment_id: int, updates: list[tuple[int, str]]) -> None:
+        with self._postgres_pool.connection() as conn:
+            with conn.pipeline(), conn.cursor() as cur:
+                for status, run_case_ids in _group_status_updates(updates):
+                    allowed_from, set_started_at = _case_status_transition(status)
+                    self._execute_case_status_update_postgres(
+                        cur,
+                        experiment_id=experiment_id,
+                        run_case_ids=run_case_ids,
+                        status=status,
+                        allowed_from=allowed_from,
+                        set_started_at=set_started_at,
+                    )
+                if _updates_change_case_counts(updates):
+                    self._refresh_experiment_status_postgres(cur, experiment_id)
 
     def _update_case_status_postgres(
         self,
@@ -289,189 +354,98 @@ class DbRepository:
     ) -> None:
         if not run_case_ids:
             return
-        try:
-            import psycopg  # type: ignore
-        except Exception as exc:
-            raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres persistence") from exc
-
-        if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
+        with self._postgres_pool.connection() as conn:
+            with conn.cursor() as cur:
+                self._execute_case_status_update_postgres(
+                    cur,
+                    experiment_id=experiment_id,
+                    run_case_ids=run_case_ids,
+                    status=status,
+                    allowed_from=allowed_from,
+                    set_started_at=set_started_at,
+                )
+                self._refresh_experiment_status_postgres(cur, experiment_id)
 
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
-        )
-        started_at_sql = "\n                           , started_at = COALESCE(started_at, CURRENT_TIMESTAMP)" if set_started_at else ""
-        allowed_sql = " AND status = ANY(%s)" if allowed_from else ""
+    def _execute_case_status_update_postgres(
+        self,
+        cur: Any,
+        *,
+        experiment_id: int,
+        run_case_ids: list[int],
+        status: str,
+        allowed_from: list[str] | None,
+        set_started_at: bool,
+    ) -> None:
         params: list[Any] = [status, experiment_id, run_case_ids]
         if allowed_from:
             params.append(allowed_from)
-        with psycopg.connect(dsn) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    f"""
-                    UPDATE run_cases
-                       SET status = %s{started_at_sql},
-                           updated_at = CURRENT_TIMESTAMP
-                     WHERE experiment_id = %s
-                       AND id = ANY(%s)
-                       {allowed_sql}
-                    """,
-                    params,
-                )
-                self._refresh_experiment_status_postgres(cur, experiment_id)
-            conn.commit()
+        cur.execute(_UPDATE_CASE_STATUS_POSTGRES_SQL[(bool(allowed_from), set_started_at)], params, prepare=True)
 
     def _refresh_experiment_status_postgres(self, cur: Any, experiment_id: int) -> None:
-        cur.execute("SELECT queue_status FROM experiments WHERE id = %s LIMIT 1", (experiment_id,))
-        exp_row = cur.fetchone()
-        current_queue_status = str(exp_row[0]) if exp_row and exp_row[0] is not None else ""
-        if current_queue_status == "manual_terminated":
-            return
-        keep_test_case_status = current_queue_status == "test_case"
-        cur.execute(
-            """
-            SELECT
-              COUNT(*) AS total_count,
-              SUM(CASE WHEN status IN ('running','trajectory','scoring') THEN 1 ELSE 0 END) AS running_count,
-              SUM(CASE WHEN status IN ('pending','queued') THEN 1 ELSE 0 END) AS pending_count,
-              SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS success_count,
-              SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END) AS failed_count
-            FROM run_cases
-            WHERE experiment_id = %s AND is_latest = TRUE
-            """,
-            (experiment_id,),
-        )
-        total, running, pending, success, failed = cur.fetchone()
-        run_status = "idle"
-        if total > 0 and (running > 0 or pending > 0):
-            run_status = "consuming"
-        elif total > 0 and failed == 0:
-            run_status = "done"
-        elif total > 0 and success == 0:
-            run_status = "failed"
-        elif total > 0:
-            run_status = "done"
-        next_queue_status = "test_case" if keep_test_case_status else run_status
-        cur.execute(
-            """
-            UPDATE experiments
-               SET queue_status = %s,
-                   started_at = CASE WHEN %s = 'consuming' AND started_at IS NULL THEN CURRENT_TIMESTAMP ELSE started_at END,
-                   finished_at = CASE WHEN %s IN ('done', 'failed') THEN CURRENT_TIMESTAMP ELSE finished_at END,
-                   updated_at = CURRENT_TIMESTAMP
-             WHERE id = %s
-            """,
-            (next_queue_status, run_status, run_status, experiment_id),
-        )
+        cur.execute(_REFRESH_EXPERIMENT_STATUS_POSTGRES_SQL, (experiment_id, experiment_id), prepare=True)
 
-    def _persist_case_result_mysql(
+    def _persist_case_results_mysql(
         self,
         *,
         experiment_id: int,
-        run_case_id: int,
-        result: CaseExecutionResult,
-        runtime_snapshot: dict[str, Any],
+        items: list[tuple[int, CaseExecutionResult, dict[str, Any]]],
     ) -> None:
-        try:
-            import pymysql  # type: ignore
-        except Exception as exc:
-            logger.warning("code=E_DB_DRIVER_FALLBACK driver=pymysql err=%s", exc)
-            self._persist_case_result_mysql_cli(
-                experiment_id=experiment_id,
-                run_case_id=run_case_id,
-                result=result,
-                runtime_snapshot=runtime_snapshot,
-            )
-            return
-
-        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
-
-        conn = pymysql.connect(
-            host=self.settings.mysql_server,
-            port=self.settings.mysql_port,
-            user=self.settings.mysql_user,
-            password=self.settings.mysql_password or "",
-            database=self.settings.mysql_db,
-            autocommit=False,
-        )
-        try:
+        with self._mysql_pool.connection() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    UPDATE run_cases
-                       SET status = %s,
-                           agent_trajectory = %s,
-                           agent_output = %s,
-                           latency_ms = %s,
-                           logs = %s,
-                           error_message = %s,
-                           runtime_snapshot_json = %s,
-                           inspect_eval_id = %s,
-                           inspect_sample_id = %s,
-                           usage_json = %s,
-                           finished_at = CURRENT_TIMESTAMP,
-                           updated_at = CURRENT_TIMESTAMP
-                     WHERE id = %s
-                    """,
-                    (
-                        result.status,
-                        json.dumps(result.trajectory) if result.trajectory is not None else None,
-                        json.dumps(result.output) if result.output is not None else None,
-                        result.latency_ms,
-                        result.logs,
-                        result.error_message or None,
-                        json.dumps(runtime_snapshot),
-                        result.inspect_eval_id or None,
-                        result.inspect_sample_id or None,
-                        json.dumps(result.usage),
-                        run_case_id,
-                    ),
-                )
-                cur.execute("DELETE FROM run_case_scores WHERE run_case_id = %s", (run_case_id,))
-                cur.execute("DELETE FROM evaluate_results WHERE run_case_id = %s", (run_case_id,))
-                for scorer in result.scorer_results:
-                    evaluator_id = int(scorer.get("evaluator_id") or 0)
-                    cur.execute(
-                        """
-                        INSERT INTO run_case_scores(run_case_id, scorer_key, score, reason, raw_result_json)
-                        VALUES (%s, %s, %s, %s, %s)
-                        """,
-                        (
-                            run_case_id,
-                            str(scorer.get("scorer_key", "unknown")),
-                            float(scorer.get("score", 0.0)),
-                            str(scorer.get("reason", "")),
-                            json.dumps(scorer.get("raw_result", {})),
-                        ),
-                    )
-                    if evaluator_id > 0:
-                        cur.execute(
-                            """
-                            INSERT INTO evaluate_results(run_case_id, evaluator_id, score, reason, raw_result)
-                            VALUES (%s, %s, %s, %s, %s)
-                            """,
-                            (
-                                run_case_id,
-                                evaluator_id,
-                                float(scorer.get("score", 0.0)),
-                                str(scorer.get("reason", "")),
-                                json.dumps(scorer.get("raw_result", {})),
-                            ),
-                        )
-                if result.scorer_results:
-                    cur.execute(
-                        "UPDATE run_cases SET final_score = (SELECT AVG(score) FROM run_case_scores WHERE run_case_id = %s) WHERE id = %s",
-                        (run_case_id, run_case_id),
-                    )
+                self._write_case_results_mysql(cur, items)
                 self._refresh_experiment_status_mysql(cur, experiment_id)
-            conn.commit()
-        finally:
-            conn.close()
+
+    def _write_case_results_mysql(
+        self,
+        cur: Any,
+        items: list[tuple[int, CaseExecutionResult, dict[str, Any]]],
+    ) -> None:
+        score_rows: list[_ScoreRow] = []
+        evaluator_rows: list[_EvaluatorRow] = []
+        for run_case_id, result, runtime_snapshot in items:
+            case_score_rows, case_evaluator_rows = _scorer_rows(run_case_id, result.scorer_results, _dumps_json)
+            cur.execute(
+                """
+                UPDATE run_cases
+                   SET status = %s,
+                       agent_trajectory = %s,
+                       agent_output = %s,
+                       latency_ms = %s,
+                       logs = %s,
+                       error_message = %s,
+                       runtime_snapshot_json = %s,
+                       inspect_eval_id = %s,
+                       inspect_sample_id = %s,
+                       usage_json = %s,
+                       final_score = COALESCE(%s, final_score),
+                       finished_at = CURRENT_TIMESTAMP,
+                       updated_at = CURRENT_TIMESTAMP
+                 WHERE id = %s
+                """,
+                _run_case_update_params(run_case_id, result, runtime_snapshot, case_score_rows, _dumps_json),
+            )
+            score_rows.extend(case_score_rows)
+            evaluator_rows.extend(case_evaluator_rows)
+        run_case_ids = [run_case_id for run_case_id, _, _ in items]
+        id_placeholders = ", ".join(["%s"] * len(run_case_ids))
+        cur.execute(f"DELETE FROM run_case_scores WHERE run_case_id IN ({id_placeholders})", run_case_ids)
+        cur.execute(f"DELETE FROM evaluate_results WHERE run_case_id IN ({id_placeholders})", run_case_ids)
+        if score_rows:
+            cur.executemany(
+                """
+                INSERT INTO run_case_scores(run_case_id, scorer_key, score, reason, raw_result_json)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                score_rows,
+            )
+        if evaluator_rows:
+            cur.executemany(
+                """
+                INSERT INTO evaluate_results(run_case_id, evaluator_id, score, reason, raw_result)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                evaluator_rows,
+            )
 
     def _mark_cases_running_mysql(self, *, experiment_id: int, run_case_ids: list[int]) -> None:
         self._update_case_status_mysql(
@@ -491,23 +465,21 @@ class DbRepository:
             set_started_at=False,
         )
 
-    def _mark_case_status_mysql(self, *, experiment_id: int, run_case_id: int, status: str) -> None:
-        allowed_from: list[str] | None = None
-        set_started_at = False
-        if status == "running":
-            allowed_from = ["pending", "queued", "trajectory"]
-            set_started_at = True
-        elif status == "trajectory":
-            allowed_from = ["running", "scoring"]
-        elif status == "scoring":
-            allowed_from = ["running", "trajectory"]
-        self._update_case_status_mysql(
-            experiment_id=experiment_id,
-            run_case_ids=[run_case_id],
-            status=status,
-            allowed_from=allowed_from,
-            set_started_at=set_started_at,
-        )
+    def _mark_case_statuses_mysql(self, *, experiment_id: int, updates: list[tuple[int, str]]) -> None:
+        with self._mysql_pool.connection() as conn:
+            with conn.cursor() as cur:
+                for status, run_case_ids in _group_status_updates(updates):
+                    allowed_from, set_started_at = _case_status_transition(status)
+                    self._execute_case_status_update_mysql(
+                        cur,
+                        experiment_id=experiment_id,
+                        run_case_ids=run_case_ids,
+                        status=status,
+                        allowed_from=allowed_from,
+                        set_started_at=set_started_at,
+                    )
+                if _updates_change_case_counts(updates):
+                    self._refresh_experiment_status_mysql(cur, experiment_id)
 
     def _update_case_status_mysql(
         self,
@@ -520,322 +492,144 @@ class DbRepository:
     ) -> None:
         if not run_case_ids:
             return
-        try:
-            import pymysql  # type: ignore
-        except Exception as exc:
-            logger.warning("code=E_DB_DRIVER_FALLBACK driver=pymysql err=%s", exc)
-            self._update_case_status_mysql_cli(
-                experiment_id=experiment_id,
-                run_case_ids=run_case_ids,
-                status=status,
-                allowed_from=allowed_from,
-                set_started_at=set_started_at,
-            )
-            return
-
-        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
-
-        conn = pymysql.connect(
-            host=self.settings.mysql_server,
-            port=self.settings.mysql_port,
-            user=self.settings.mysql_user,
-            password=self.settings.mysql_password or "",
-            database=self.settings.mysql_db,
-            autocommit=False,
-        )
-        try:
+        with self._mysql_pool.connection() as conn:
             with conn.cursor() as cur:
-                id_placeholders = ", ".join(["%s"] * len(run_case_ids))
-                started_at_sql = "\n                           , started_at = IFNULL(started_at, CURRENT_TIMESTAMP)" if set_started_at else ""
-                allowed_sql = ""
-                params: list[Any] = [status, experiment_id, *run_case_ids]
-                if allowed_from:
-                    allowed_placeholders = ", ".join(["%s"] * len(allowed_from))
-                    allowed_sql = f" AND status IN ({allowed_placeholders})"
-                    params.extend(allowed_from)
-                cur.execute(
-                    f"""
-                    UPDATE run_cases
-                       SET status = %s{started_at_sql},
-                           updated_at = CURRENT_TIMESTAMP
-                     WHERE experiment_id = %s
-                       AND id IN ({id_placeholders})
-                       {allowed_sql}
-                    """,
-                    params,
+                self._execute_case_status_update_mysql(
+                    cur,
+                    experiment_id=experiment_id,
+                    run_case_ids=run_case_ids,
+                    status=status,
+                    allowed_from=allowed_from,
+                    set_started_at=set_started_at,
                 )
                 self._refresh_experiment_status_mysql(cur, experiment_id)
-            conn.commit()
-        finally:
-            conn.close()
 
-    def _update_case_status_mysql_cli(
+    def _execute_case_status_update_mysql(
         self,
+        cur: Any,
         *,
         experiment_id: int,
         run_case_ids: list[int],
         status: str,
-        allowed_from: list[str] | None = None,
-        set_started_at: bool = False,
+        allowed_from: list[str] | None,
+        set_started_at: bool,
     ) -> None:
-        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
-        if self.settings.mysql_password is None:
-            raise RuntimeError("E_DB_CONFIG_MISSING: MYSQL_PASSWORD is not configured")
-
-        def lit(value: Any) -> str:
-            if value is None:
-                return "NULL"
-            if isinstance(value, bool):
-                return "1" if value else "0"
-            if isinstance(value, (int, float)):
-                return str(value)
-            text = str(value)
-            text = text.replace("\\", "\\\\").replace("'", "\\'")
-            return f"'{text}'"
-
-        ids_sql = ", ".join(lit(v) for v in run_case_ids)
+        id_placeholders = ", ".join(["%s"] * len(run_case_ids))
+        started_at_sql = "\n                   , started_at = IFNULL(started_at, CURRENT_TIMESTAMP)" if set_started_at else ""
         allowed_sql = ""
+        params: list[Any] = [status, experiment_id, *run_case_ids]
         if allowed_from:
-            allowed_sql = f" AND status IN ({', '.join(lit(v) for v in allowed_from)})"
-        started_sql = ", started_at=IFNULL(started_at, CURRENT_TIMESTAMP)" if set_started_at else ""
-        sql = (
-            "START TRANSACTION;\n"
-            "UPDATE run_cases SET "
-            f"status={lit(status)}"
-            f"{started_sql}, "
-            "updated_at=CURRENT_TIMESTAMP "
-            f"WHERE experiment_id={lit(experiment_id)} "
-            f"AND id IN ({ids_sql}) "
-            f"{allowed_sql};\n"
-            "SET @total=(SELECT COUNT(*) FROM run_cases WHERE experiment_id="
-            f"{lit(experiment_id)} AND is_latest=TRUE);\n"
-            "SET @running=(SELECT COALESCE(SUM(CASE WHEN status IN ('running','trajectory','scoring') THEN 1 ELSE 0 END),0) "
-            f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE);\n"
-            "SET @pending=(SELECT COALESCE(SUM(CASE WHEN status IN ('pending','queued') THEN 1 ELSE 0 END),0) "
-            f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE);\n"
-            "SET @success=(SELECT COALESCE(SUM(CASE WHEN status='success' THEN 1 ELSE 0 END),0) "
-            f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE);\n"
-            "SET @failed=(SELECT COALESCE(SUM(CASE WHEN status IN ('failed','timeout') THEN 1 ELSE 0 END),0) "
-            f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE);\n"
-            "SET @prev_queue_status=(SELECT queue_status FROM experiments WHERE id="
-            f"{lit(experiment_id)} LIMIT 1);\n"
-            "SET @run_status=(CASE "
-            "WHEN @total=0 THEN 'idle' "
-            "WHEN @running>0 OR @pending>0 THEN 'consuming' "
-            "WHEN @failed=0 THEN 'done' "
-            "WHEN @success=0 THEN 'failed' "
-            "ELSE 'done' END);\n"
-            "UPDATE experiments SET "
-            "queue_status=IF(@prev_queue_status='manual_terminated', queue_status, IF(@prev_queue_status='test_case', 'test_case', @run_status)), "
-            "started_at=IF(@prev_queue_status<>'manual_terminated' AND @run_status='consuming' AND started_at IS NULL, CURRENT_TIMESTAMP, started_at), "
-            "finished_at=IF(@prev_queue_status<>'manual_terminated' AND @run_status IN ('done','failed'), CURRENT_TIMESTAMP, finished_at), "
-            "updated_at=CURRENT_TIMESTAMP "
-            f"WHERE id={lit(experiment_id)};\n"
-            "COMMIT;"
-        )
-        env = dict(os.environ)
-        env["MYSQL_PWD"] = self.settings.mysql_password
-        proc = subprocess.run(
-            [
-                "mysql",
-                "-h",
-                self.settings.mysql_server,
-                "-P",
-                str(self.settings.mysql_port),
-                "-u",
-                self.settings.mysql_user,
-                self.settings.mysql_db,
-                "-e",
-                sql,
-            ],
-            check=False,
-            capture_output=True,
-            text=True,
-            env=env,
-        )
-        if proc.returncode != 0:
-            raise RuntimeError(f"E_DB_MARK_STATUS_CLI: {proc.stderr.strip()}")
-
-    def _persist_case_result_mysql_cli(
-        self,
-        *,
-        experiment_id: int,
-        run_case_id: int,
-        result: CaseExecutionResult,
-        runtime_snapshot: dict[str, Any],
-    ) -> None:
-        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
-        if self.settings.mysql_password is None:
-            raise RuntimeError("E_DB_CONFIG_MISSING: MYSQL_PASSWORD is not configured")
-
-        def lit(value: Any) -> str:
-            if value is None:
-                return "NULL"
-            if isinstance(value, bool):
-                return "1" if value else "0"
-            if isinstance(value, (int, float)):
-                return str(value)
-            text = str(value)
-            text = text.replace("\\", "\\\\").replace("'", "\\'")
-            return f"'{text}'"
-
-        sql_parts = [
-            "START TRANSACTION",
-            (
-                "UPDATE run_cases SET "
-                f"status={lit(result.status)}, "
-                f"agent_trajectory={lit(json.dumps(result.trajectory) if result.trajectory is not None else None)}, "
-                f"agent_output={lit(json.dumps(result.output) if result.output is not None else None)}, "
-                f"latency_ms={lit(result.latency_ms)}, "
-                f"logs={lit(result.logs)}, "
-                f"error_message={lit(result.error_message or None)}, "
-                f"runtime_snapshot_json={lit(json.dumps(runtime_snapshot))}, "
-                f"inspect_eval_id={lit(result.inspect_eval_id or None)}, "
-                f"inspect_sample_id={lit(result.inspect_sample_id or None)}, "
-                f"usage_json={lit(json.dumps(result.usage))}, "
-                "finished_at=CURRENT_TIMESTAMP, updated_at=CURRENT_TIMESTAMP "
-                f"WHERE id={lit(run_case_id)}"
-            ),
-            f"DELETE FROM run_case_scores WHERE run_case_id={lit(run_case_id)}",
-            f"DELETE FROM evaluate_results WHERE run_case_id={lit(run_case_id)}",
-        ]
-        for scorer in result.scorer_results:
-            evaluator_id = int(scorer.get("evaluator_id") or 0)
-            sql_parts.append(
-                "INSERT INTO run_case_scores(run_case_id, scorer_key, score, reason, raw_result_json) VALUES ("
-                f"{lit(run_case_id)}, "
-                f"{lit(str(scorer.get('scorer_key', 'unknown')))}, "
-                f"{lit(float(scorer.get('score', 0.0)))}, "
-                f"{lit(str(scorer.get('reason', '')))}, "
-                f"{lit(json.dumps(scorer.get('raw_result', {})))}"
-                ")"
-            )
-            if evaluator_id > 0:
-                sql_parts.append(
-                    "INSERT INTO evaluate_results(run_case_id, evaluator_id, score, reason, raw_result) VALUES ("
-                    f"{lit(run_case_id)}, "
-                    f"{lit(evaluator_id)}, "
-                    f"{lit(float(scorer.get('score', 0.0)))}, "
-                    f"{lit(str(scorer.get('reason', '')))}, "
-                    f"{lit(json.dumps(scorer.get('raw_result', {})))}"
-                    ")"
-                )
-        if result.scorer_results:
-            sql_parts.append(
-                f"UPDATE run_cases SET final_score=(SELECT AVG(score) FROM run_case_scores WHERE run_case_id={lit(run_case_id)}) WHERE id={lit(run_case_id)}"
-            )
-        sql_parts.extend(
-            [
-                (
-                    "SET @total=(SELECT COUNT(*) FROM run_cases WHERE experiment_id="
-                    f"{lit(experiment_id)} AND is_latest=TRUE)"
-                ),
-                (
-                    "SET @running=(SELECT COALESCE(SUM(CASE WHEN status IN ('running','trajectory','scoring') THEN 1 ELSE 0 END),0) "
-                    f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE)"
-                ),
-                (
-                    "SET @pending=(SELECT COALESCE(SUM(CASE WHEN status IN ('pending','queued') THEN 1 ELSE 0 END),0) "
-                    f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE)"
-                ),
-                (
-                    "SET @success=(SELECT COALESCE(SUM(CASE WHEN status='success' THEN 1 ELSE 0 END),0) "
-                    f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE)"
-                ),
-                (
-                    "SET @failed=(SELECT COALESCE(SUM(CASE WHEN status IN ('failed','timeout') THEN 1 ELSE 0 END),0) "
-                    f"FROM run_cases WHERE experiment_id={lit(experiment_id)} AND is_latest=TRUE)"
-                ),
-                (
-                    "SET @prev_queue_status=(SELECT queue_status FROM experiments WHERE id="
-                    f"{lit(experiment_id)} LIMIT 1)"
-                ),
-                (
-                    "SET @run_status=(CASE "
-                    "WHEN @total=0 THEN 'idle' "
-                    "WHEN @running>0 OR @pending>0 THEN 'consuming' "
-                    "WHEN @failed=0 THEN 'done' "
-                    "WHEN @success=0 THEN 'failed' "
-                    "ELSE 'done' END)"
-                ),
-                (
-                    "UPDATE experiments SET "
-                    "queue_status=IF(@prev_queue_status='manual_terminated', queue_status, IF(@prev_queue_status='test_case', 'test_case', @run_status)), "
-                    "started_at=IF(@prev_queue_status<>'manual_terminated' AND @run_status='consuming' AND started_at IS NULL, CURRENT_TIMESTAMP, started_at), "
-                    "finished_at=IF(@prev_queue_status<>'manual_terminated' AND @run_status IN ('done','failed'), CURRENT_TIMESTAMP, finished_at), "
-                    "updated_at=CURRENT_TIMESTAMP "
-                    f"WHERE id={lit(experiment_id)}"
-                ),
-                "COMMIT",
-            ]
-        )
-        sql = ";\n".join(sql_parts) + ";"
-        env = dict(os.environ)
-        env["MYSQL_PWD"] = self.settings.mysql_password
-        proc = subprocess.run(
-            [
-                "mysql",
-                "-h",
-                self.settings.mysql_server,
-                "-P",
-                str(self.settings.mysql_port),
-                "-u",
-                self.settings.mysql_user,
-                self.settings.mysql_db,
-                "-e",
-                sql,
-            ],
-            check=False,
-            capture_output=True,
-            text=True,
-            env=env,
-        )
-        if proc.returncode != 0:
-            raise RuntimeError(f"E_DB_PERSIST_CLI: {proc.stderr.strip()}")
-
-    def _refresh_experiment_status_mysql(self, cur: Any, experiment_id: int) -> None:
-        cur.execute("SELECT queue_status FROM experiments WHERE id = %s LIMIT 1", (experiment_id,))
-        exp_row = cur.fetchone()
-        current_queue_status = str(exp_row[0]) if exp_row and exp_row[0] is not None else ""
-        if current_queue_status == "manual_terminated":
-            return
-        keep_test_case_status = current_queue_status == "test_case"
+            allowed_placeholders = ", ".join(["%s"] * len(allowed_from))
+            allowed_sql = f" AND status IN ({allowed_placeholders})"
+            params.extend(allowed_from)
         cur.execute(
-            """
-            SELECT
-              COUNT(*) AS total_count,
-              SUM(CASE WHEN status IN ('running','trajectory','scoring') THEN 1 ELSE 0 END) AS running_count,
-              SUM(CASE WHEN status IN ('pending','queued') THEN 1 ELSE 0 END) AS pending_count,
-              SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) AS success_count,
-              SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END) AS failed_count
-            FROM run_cases
-            WHERE experiment_id = %s AND is_latest = TRUE
-            """,
-            (experiment_id,),
-        )
-        row = cur.fetchone() or (0, 0, 0, 0, 0)
-        total, running, pending, success, failed = [int(v or 0) for v in row]
-        run_status = "idle"
-        if total > 0 and (running > 0 or pending > 0):
-            run_status = "consuming"
-        elif total > 0 and failed == 0:
-            run_status = "done"
-        elif total > 0 and success == 0:
-            run_status = "failed"
-        elif total > 0:
-            run_status = "done"
-        next_queue_status = "test_case" if keep_test_case_status else run_status
-        cur.execute(
-            """
-            UPDATE experiments
-               SET queue_status = %s,
-                   started_at = IF(%s = 'consuming' AND started_at IS NULL, CURRENT_TIMESTAMP, started_at),
-                   finished_at = IF(%s IN ('done', 'failed'), CURRENT_TIMESTAMP, finished_at),
+            f"""
+            UPDATE run_cases
+               SET status = %s{started_at_sql},
                    updated_at = CURRENT_TIMESTAMP
-             WHERE id = %s
+             WHERE experiment_id = %s
+               AND id IN ({id_placeholders})
+               {allowed_sql}
             """,
-            (next_queue_status, run_status, run_status, experiment_id),
+            params,
         )
+
+    def _refresh_experiment_status_mysql(self, cur: Any, experiment_id: int) -> None:
+        cur.execute(_REFRESH_EXPERIMENT_STATUS_MYSQL_SQL, (experiment_id, experiment_id))
+
+
+_JsonEncoder = Callable[[Any], object]
+_ScoreRow = tuple[int, str, float, str, object]
+_EvaluatorRow = tuple[int, int, float, str, object]
+
+
+def _dumps_json(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _orjson_bytes(data: bytes) -> bytes:
+    return data
+
+
+def _jsonb_param(value: Any) -> object:
+    """Bind a JSON value for postgres as jsonb, handing orjson's UTF-8 bytes straight to psycopg."""
+    if Jsonb is None:
+        raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres persistence")
+    return Jsonb(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), dumps=_orjson_bytes)
+
+
+def _run_case_update_params(
+    run_case_id: int,
+    result: CaseExecutionResult,
+    runtime_snapshot: dict[str, Any],
+    score_rows: list[_ScoreRow],
+    encode_json: _JsonEncoder,
+) -> tuple[object, ...]:
+    """Parameters for the engine-specific `UPDATE run_cases` statements, in placeholder order."""
+    return (
+        result.status,
+        encode_json(result.trajectory) if result.trajectory is not None else None,
+        encode_json(result.output) if result.output is not None else None,
+        result.latency_ms,
+        result.logs,
+        result.error_message or None,
+        encode_json(runtime_snapshot),
+        result.inspect_eval_id or None,
+        result.inspect_sample_id or None,
+        encode_json(result.usage),
+        _mean_score(score_rows),
+        run_case_id,
+    )
+
+
+def _mean_score(score_rows: list[_ScoreRow]) -> float | None:
+    """Same value as AVG(score) over the rows just inserted; None keeps the stored final_score."""
+    if not score_rows:
+        return None
+    return sum(row[2] for row in score_rows) / len(score_rows)
+
+
+def _scorer_rows(
+    run_case_id: int,
+    scorer_results: list[ScorerResult],
+    encode_json: _JsonEncoder,
+) -> tuple[list[_ScoreRow], list[_EvaluatorRow]]:
+    """Build run_case_scores and evaluate_results rows, serializing each raw_result once."""
+    score_rows: list[_ScoreRow] = []
+    evaluator_rows: list[_EvaluatorRow] = []
+    for scorer in scorer_results:
+        raw_result = encode_json(scorer.raw_result)
+        score_rows.append((run_case_id, scorer.scorer_key, scorer.score, scorer.reason, raw_result))
+        if scorer.evaluator_id > 0:
+            evaluator_rows.append((run_case_id, scorer.evaluator_id, scorer.score, scorer.reason, raw_result))
+    return score_rows, evaluator_rows
+
+
+# Both stay inside the running_count bucket of the refresh aggregate, so the experiment status cannot move.
+_IN_FLIGHT_CASE_STATUSES = frozenset({"trajectory", "scoring"})
+
+
+def _updates_change_case_counts(updates: list[tuple[int, str]]) -> bool:
+    return any(status not in _IN_FLIGHT_CASE_STATUSES for _, status in updates)
+
+
+def _group_status_updates(updates: list[tuple[int, str]]) -> list[tuple[str, list[int]]]:
+    """Merge consecutive updates to the same status into one id list, keeping each case's transitions in order."""
+    groups: list[tuple[str, list[int]]] = []
+    for run_case_id, status in updates:
+        if groups and groups[-1][0] == status and run_case_id not in groups[-1][1]:
+            groups[-1][1].append(run_case_id)
+        else:
+            groups.append((status, [run_case_id]))
+    return groups
+
+
+def _case_status_transition(status: str) -> tuple[list[str] | None, bool]:
+    """Return (allowed_from, set_started_at) guarding a single run_case status transition."""
+    if status == "running":
+        return ["pending", "queued", "trajectory"], True
+    if status == "trajectory":
+        return ["running", "scoring"], False
+    if status == "scoring":
+        return ["running", "trajectory"], False
+    return None, False
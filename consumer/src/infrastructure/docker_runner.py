@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-import json
 import logging
 import platform
-import subprocess
+import threading
 import time
-from typing import Any
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, TypeVar
+
+import docker
+import docker.errors
+import docker.utils
+import orjson
+import requests
+import urllib3.exceptions
 
 from domain.contracts import CaseExecutionResult, ExperimentRunRequested, RunCaseInput
 from .mock_gateway.runtime import start_mock_gateway
@@ -13,6 +21,23 @@ from runtime.runtime_command_template import render_runtime_command_template
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+AGENT_LOG_TAIL_BYTES = 4 * 1024 * 1024
+
+
+class _ReadTimeoutAPIClient(docker.APIClient):
+    """APIClient that applies its own timeout to requests docker-py sends with `timeout=None`.
+
+    `APIClient.pull` passes `timeout=None`, so without this a registry that stops sending progress
+    events would leave the pull stream reading a socket with no limit.
+    """
+
+    def send(self, request: Any, **kwargs: Any) -> Any:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
 
 class DockerRunner:
     def __init__(
@@ -32,6 +57,8 @@ class DockerRunner:
         self.pull_timeout_seconds = pull_timeout_seconds
         self.run_timeout_seconds = run_timeout_seconds
         self.inspect_timeout_seconds = inspect_timeout_seconds
+        self._clients: dict[int, docker.APIClient] = {}
+        self._present_images: set[str] = set()
 
     def run_case(self, message: ExperimentRunRequested, run_case: RunCaseInput) -> CaseExecutionResult:
         started = time.time()
@@ -110,7 +137,7 @@ class DockerRunner:
             result.error_message = str(exc)
         finally:
             result.latency_ms = int((time.time() - started) * 1000)
-            subprocess.run(["docker", "rm", "-f", container_name], check=False, capture_output=True, text=True)
+            self._docker_remove(container_name)
             if sidecar:
                 sidecar.close()
 
@@ -120,117 +147,245 @@ class DockerRunner:
     def _docker_pull(self, image: str) -> None:
         if self.pull_policy == "never":
             return
+        if self.pull_policy == "if-not-present" and image in self._present_images:
+            return
         if self.pull_policy == "if-not-present" and self._has_local_image(image):
+            self._present_images.add(image)
             return
 
         logger.info("code=DOCKER_PULL_START image=%s policy=%s", image, self.pull_policy)
-        proc = self._run_docker_command(
-            ["docker", "pull", image],
-            timeout_seconds=self.pull_timeout_seconds,
-            timeout_code="E_DOCKER_PULL_TIMEOUT",
-        )
-        if proc.returncode != 0:
+        try:
+            self._call_docker(
+                lambda api: self._stream_pull(api, image),
+                timeout_seconds=self.pull_timeout_seconds,
+                timeout_code="E_DOCKER_PULL_TIMEOUT",
+            )
+        except docker.errors.APIError as exc:
             if self._has_local_image(image):
-                logger.warning("code=E_DOCKER_PULL_FAILED_USE_LOCAL image=%s err=%s", image, proc.stderr.strip())
+                logger.warning("code=E_DOCKER_PULL_FAILED_USE_LOCAL image=%s err=%s", image, exc.explanation or exc)
+                self._present_images.add(image)
                 return
-            raise RuntimeError(f"E_DOCKER_PULL: {proc.stderr.strip()}")
+            raise RuntimeError(f"E_DOCKER_PULL: {exc.explanation or exc}") from exc
+        self._present_images.add(image)
+
+    def _stream_pull(self, api: docker.APIClient, image: str) -> None:
+        # Each read of the progress stream is bounded by the client's socket timeout (see
+        # _ReadTimeoutAPIClient), and the overall deadline is checked between events, so a pull ends
+        # no later than one read timeout past pull_timeout_seconds.
+        deadline = time.monotonic() + self.pull_timeout_seconds
+        for event in api.pull(image, stream=True, decode=True):
+            error = event.get("error")
+            if error:
+                raise docker.errors.APIError(str(error), explanation=str(error))
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"E_DOCKER_PULL_TIMEOUT: {self.pull_timeout_seconds}s image={image}")
 
     def _has_local_image(self, image: str) -> bool:
-        proc = self._run_docker_command(
-            ["docker", "image", "inspect", image],
-            timeout_seconds=self.inspect_timeout_seconds,
-            timeout_code="E_DOCKER_IMAGE_INSPECT_TIMEOUT",
-        )
-        return proc.returncode == 0
+        try:
+            self._call_docker(
+                lambda api: api.inspect_image(image),
+                timeout_seconds=self.inspect_timeout_seconds,
+                timeout_code="E_DOCKER_IMAGE_INSPECT_TIMEOUT",
+            )
+        except docker.errors.APIError:
+            return False
+        return True
 
     def _docker_run(self, image: str, container_name: str, env: dict[str, str], startup_command: str) -> str:
-        cmd = ["docker", "run", "-d", "--name", container_name]
         # Linux engines usually need explicit host-gateway mapping.
         # Docker Desktop provides host.docker.internal natively; overriding it can break routing.
-        if platform.system() == "Linux":
-            cmd.extend(["--add-host", "host.docker.internal:host-gateway"])
-        if self.docker_network:
-            cmd.extend(["--network", self.docker_network])
-        for key, value in sorted(env.items()):
-            cmd.extend(["-e", f"{key}={value}"])
+        extra_hosts = {"host.docker.internal": "host-gateway"} if platform.system() == "Linux" else None
         command_override = self.agent_exec_command or startup_command
-        if command_override:
-            cmd.extend([image, "sh", "-lc", command_override])
-        else:
-            cmd.append(image)
         logger.info("code=DOCKER_RUN_START image=%s container=%s", image, container_name)
-        proc = self._run_docker_command(
-            cmd,
-            timeout_seconds=self.run_timeout_seconds,
-            timeout_code="E_DOCKER_RUN_TIMEOUT",
-        )
-        if proc.returncode != 0:
-            raise RuntimeError(f"E_DOCKER_CREATE: {proc.stderr.strip()}")
-        return proc.stdout.strip()
+
+        def _create_and_start(api: docker.APIClient) -> str:
+            host_config = api.create_host_config(extra_hosts=extra_hosts, network_mode=self.docker_network)
+            container = api.create_container(
+                image,
+                command=["sh", "-lc", command_override] if command_override else None,
+                name=container_name,
+                environment=env,
+                detach=True,
+                host_config=host_config,
+            )
+            container_id = str(container["Id"])
+            api.start(container_id)
+            return container_id
+
+        try:
+            return self._call_docker(
+                _create_and_start,
+                timeout_seconds=self.run_timeout_seconds,
+                timeout_code="E_DOCKER_RUN_TIMEOUT",
+            )
+        except docker.errors.APIError as exc:
+            raise RuntimeError(f"E_DOCKER_CREATE: {exc.explanation or exc}") from exc
 
     def _docker_wait_and_logs(self, container_name: str) -> tuple[int, str]:
-        wait = subprocess.run(
-            ["docker", "wait", container_name],
-            check=False,
-            capture_output=True,
-            text=True,
-            timeout=self.timeout_seconds,
-        )
-        if wait.returncode != 0:
-            raise RuntimeError(f"E_DOCKER_WAIT: {wait.stderr.strip()}")
-        logs = subprocess.run(["docker", "logs", container_name], check=False, capture_output=True, text=True)
-        if logs.returncode != 0:
-            raise RuntimeError(f"E_DOCKER_LOGS: {logs.stderr.strip()}")
-        return int(wait.stdout.strip() or 1), logs.stdout.strip()
+        try:
+            wait = self._call_docker(
+                lambda api: api.wait(container_name, timeout=self.timeout_seconds),
+                timeout_seconds=self.timeout_seconds,
+                timeout_code="E_DOCKER_WAIT_TIMEOUT",
+            )
+        except docker.errors.APIError as exc:
+            raise RuntimeError(f"E_DOCKER_WAIT: {exc.explanation or exc}") from exc
+        _, logs = self._docker_logs(container_name)
+        return int(wait.get("StatusCode", 1)), logs
 
     def _docker_logs(self, container_name: str) -> tuple[int, str]:
-        logs = subprocess.run(["docker", "logs", container_name], check=False, capture_output=True, text=True)
-        if logs.returncode != 0:
-            raise RuntimeError(f"E_DOCKER_LOGS: {logs.stderr.strip()}")
-        return logs.returncode, logs.stdout.strip()
+        """Stream stdout and keep only the last AGENT_LOG_TAIL_BYTES; the agent payload is the final line."""
+
+        def _tail(api: docker.APIClient) -> tuple[bytes, int]:
+            chunks: deque[bytes] = deque()
+            kept = 0
+            dropped = 0
+            for chunk in api.logs(container_name, stdout=True, stderr=False, stream=True, follow=False):
+                chunks.append(chunk)
+                kept += len(chunk)
+                while kept - len(chunks[0]) >= AGENT_LOG_TAIL_BYTES:
+                    evicted = chunks.popleft()
+                    kept -= len(evicted)
+                    dropped += len(evicted)
+            raw = b"".join(chunks)
+            if len(raw) > AGENT_LOG_TAIL_BYTES:
+                dropped += len(raw) - AGENT_LOG_TAIL_BYTES
+                raw = raw[-AGENT_LOG_TAIL_BYTES:]
+            return raw, dropped
+
+        try:
+            raw, dropped = self._call_docker_with_deadline(
+                _tail,
+                container_name=container_name,
+                timeout_seconds=self.timeout_seconds,
+                timeout_code="E_DOCKER_LOGS_TIMEOUT",
+            )
+        except docker.errors.APIError as exc:
+            raise RuntimeError(f"E_DOCKER_LOGS: {exc.explanation or exc}") from exc
+        if dropped:
+            logger.warning("code=AGENT_LOGS_TRUNCATED container=%s dropped_bytes=%s", container_name, dropped)
+        return 0, raw.decode("utf-8", errors="replace").strip()
 
     def _docker_exec(self, container_name: str, case_exec_command: str) -> tuple[int, str]:
         logger.info("code=DOCKER_EXEC_START container=%s", container_name)
-        proc = self._run_docker_command(
-            ["docker", "exec", container_name, "sh", "-lc", case_exec_command],
-            timeout_seconds=self.timeout_seconds,
-            timeout_code="E_DOCKER_EXEC_TIMEOUT",
-        )
-        output = f"{proc.stdout}\n{proc.stderr}".strip()
-        return proc.returncode, output
+
+        def _exec(api: docker.APIClient) -> tuple[int, bytes, bytes]:
+            exec_id = api.exec_create(container_name, ["sh", "-lc", case_exec_command])["Id"]
+            stdout, stderr = api.exec_start(exec_id, demux=True)
+            exit_code = api.exec_inspect(exec_id).get("ExitCode")
+            return (1 if exit_code is None else int(exit_code)), stdout or b"", stderr or b""
+
+        try:
+            exit_code, stdout, stderr = self._call_docker_with_deadline(
+                _exec,
+                container_name=container_name,
+                timeout_seconds=self.timeout_seconds,
+                timeout_code="E_DOCKER_EXEC_TIMEOUT",
+            )
+        except docker.errors.APIError as exc:
+            return 1, str(exc.explanation or exc)
+        output = f"{stdout.decode('utf-8', errors='replace')}\n{stderr.decode('utf-8', errors='replace')}".strip()
+        return exit_code, output
 
     def _wait_container_ready(self, container_name: str, runtime_spec: dict[str, Any]) -> None:
         startup_timeout = int(runtime_spec.get("startup_timeout_seconds") or 30)
         startup_poll_interval = float(runtime_spec.get("startup_poll_interval_seconds") or 1)
         deadline = time.time() + startup_timeout
         while time.time() < deadline:
-            inspect = self._run_docker_command(
-                ["docker", "inspect", container_name, "--format", "{{.State.Running}}"],
-                timeout_seconds=self.inspect_timeout_seconds,
-                timeout_code="E_DOCKER_INSPECT_TIMEOUT",
-            )
-            if inspect.returncode == 0 and inspect.stdout.strip().lower() == "true":
+            try:
+                state = self._call_docker(
+                    lambda api: api.inspect_container(container_name),
+                    timeout_seconds=self.inspect_timeout_seconds,
+                    timeout_code="E_DOCKER_INSPECT_TIMEOUT",
+                ).get("State") or {}
+            except docker.errors.APIError:
+                state = {}
+            if state.get("Running") is True:
                 return
             time.sleep(startup_poll_interval)
         raise RuntimeError(f"E_CONTAINER_STARTUP_TIMEOUT: container={container_name} timeout={startup_timeout}s")
 
-    def _run_docker_command(
+    def _docker_remove(self, container_name: str) -> None:
+        try:
+            self._call_docker(
+                lambda api: api.remove_container(container_name, force=True),
+                timeout_seconds=self.run_timeout_seconds,
+                timeout_code="E_DOCKER_RM_TIMEOUT",
+            )
+        except docker.errors.NotFound:
+            return
+        except Exception as exc:
+            logger.warning("code=E_DOCKER_RM_FAILED container=%s err=%s", container_name, exc)
+
+    def _api(self, timeout_seconds: int) -> docker.APIClient:
+        """Engine API client whose socket timeout is `timeout_seconds`.
+
+        Clients honour DOCKER_HOST / DOCKER_TLS_VERIFY / DOCKER_CERT_PATH like the docker CLI, are created
+        on first use so constructing a runner never touches the daemon, and are kept per distinct timeout
+        so every operation keeps its own configured limit on a reused connection.
+        """
+        client = self._clients.get(timeout_seconds)
+        if client is None:
+            client = self._clients.setdefault(timeout_seconds, self._new_api(timeout_seconds))
+        return client
+
+    def _new_api(self, timeout_seconds: int) -> docker.APIClient:
+        try:
+            return _ReadTimeoutAPIClient(
+                **docker.utils.kwargs_from_env(),
+                version="auto",
+                timeout=timeout_seconds,
+            )
+        except docker.errors.DockerException as exc:
+            raise RuntimeError(f"E_DOCKER_DAEMON_UNAVAILABLE: {exc}") from exc
+
+    def _call_docker(
         self,
-        cmd: list[str],
+        op: Callable[[docker.APIClient], T],
         *,
         timeout_seconds: int,
         timeout_code: str,
-    ) -> subprocess.CompletedProcess[str]:
+    ) -> T:
         try:
-            return subprocess.run(
-                cmd,
-                check=False,
-                capture_output=True,
-                text=True,
-                timeout=timeout_seconds,
-            )
-        except subprocess.TimeoutExpired as exc:
-            raise RuntimeError(f"{timeout_code}: {timeout_seconds}s cmd={' '.join(cmd)}") from exc
+            return op(self._api(timeout_seconds))
+        except (requests.exceptions.Timeout, urllib3.exceptions.ReadTimeoutError, TimeoutError) as exc:
+            raise RuntimeError(f"{timeout_code}: {timeout_seconds}s {exc}") from exc
+        except requests.exceptions.ConnectionError as exc:
+            raise RuntimeError(f"E_DOCKER_DAEMON_UNAVAILABLE: {exc}") from exc
+
+    def _call_docker_with_deadline(
+        self,
+        op: Callable[[docker.APIClient], T],
+        *,
+        container_name: str,
+        timeout_seconds: int,
+        timeout_code: str,
+    ) -> T:
+        """Run a container stream operation under a total deadline of `timeout_seconds`.
+
+        docker-py reads exec and log streams through poll() without a timeout, so the socket timeout
+        never fires on them. The operation runs on a worker thread; once the deadline passes the
+        container is force-removed, which makes the daemon close the stream, and the worker is joined
+        before the timeout is raised.
+        """
+        done: Future[T] = Future()
+
+        def _run() -> None:
+            try:
+                done.set_result(self._call_docker(op, timeout_seconds=timeout_seconds, timeout_code=timeout_code))
+            except BaseException as exc:
+                done.set_exception(exc)
+
+        worker = threading.Thread(target=_run, name=f"docker-{container_name}", daemon=True)
+        worker.start()
+        worker.join(timeout_seconds)
+        if worker.is_alive():
+            self._docker_remove(container_name)
+            worker.join(self.run_timeout_seconds)
+            if worker.is_alive():
+                logger.warning("code=E_DOCKER_STREAM_STILL_OPEN container=%s op=%s", container_name, timeout_code)
+            raise RuntimeError(f"{timeout_code}: {timeout_seconds}s container={container_name}")
+        return done.result()
 
     def _build_env(self, message: ExperimentRunRequested, run_case: RunCaseInput, mock_base_url: str | None) -> dict[str, str]:
         del message
@@ -254,21 +409,26 @@ class DockerRunner:
         }
 
     def _parse_agent_output(self, raw_logs: str) -> dict[str, Any] | None:
-        lines = [line.strip() for line in raw_logs.splitlines() if line.strip()]
-        for line in reversed(lines):
-            if not (line.startswith("{") or line.startswith("[")):
+        # Walk line boundaries backwards over the bytes; the payload is usually the last line.
+        buf = raw_logs.encode()
+        end = len(buf)
+        while end > 0:
+            start = buf.rfind(b"\n", 0, end) + 1
+            line = buf[start:end].strip()
+            end = start - 1
+            if line[:1] not in (b"{", b"["):
                 continue
             try:
-                parsed = json.loads(line)
-            except json.JSONDecodeError:
+                parsed = orjson.loads(line)
+            except orjson.JSONDecodeError:
                 continue
             if isinstance(parsed, dict):
                 return parsed
         try:
-            parsed = json.loads(raw_logs)
+            parsed = orjson.loads(raw_logs)
             if isinstance(parsed, dict):
                 return parsed
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return None
         return None
 
@@ -298,3 +458,4 @@ class DockerRunner:
             if texts:
                 return "\n".join(texts), []
         return {"raw_stdout": raw_logs}, []
+
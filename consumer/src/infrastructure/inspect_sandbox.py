@@ -1,18 +1,28 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import platform
 import shlex
 import time
+import uuid
 from pathlib import PurePosixPath
 from typing import Any
 
+import orjson
 from inspect_ai.util import ExecResult, SandboxConnection, SandboxEnvironment, sandboxenv
 
 logger = logging.getLogger(__name__)
 
+# Linux caps a single argv string at MAX_ARG_STRLEN (128 KiB); larger `sh -lc` scripts are
+# rendered from run_case data (session_jsonl, user_input) and go through a file instead.
+_INLINE_SCRIPT_MAX_BYTES = 64 * 1024
+# Images known to be present locally ("if-not-present" needs no further checks for the worker lifetime).
+_PRESENT_IMAGES: set[str] = set()
+# Pulls in flight, keyed by (event loop, image), so concurrent sample_init calls on one loop share
+# one `docker pull`; a future is never awaited from a loop other than the one that created it.
+_PULLS_IN_FLIGHT: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Future[None]] = {}
+
 
 async def _run_cmd(
     cmd: list[str],
@@ -64,18 +74,38 @@ class ArcloopDockerSandbox(SandboxEnvironment):
     ) -> ExecResult[str]:
         del timeout_retry
         del concurrency
+        if input is None and len(cmd) == 3 and cmd[1] == "-lc" and len(cmd[2].encode("utf-8")) > _INLINE_SCRIPT_MAX_BYTES:
+            return await self._exec_script_file(cmd[0], cmd[2], cwd=cwd, env=env, user=user, timeout=timeout)
         docker_cmd = ["docker", "exec"]
         if user:
             docker_cmd.extend(["-u", user])
         if cwd:
             docker_cmd.extend(["-w", cwd])
         if env:
-            for key, value in sorted(env.items()):
-                docker_cmd.extend(["-e", f"{key}={value}"])
+            for key, value in env.items():
+                docker_cmd.extend(("-e", f"{key}={value}"))
         docker_cmd.append(self.container_name)
         docker_cmd.extend(cmd)
         return await _run_cmd(docker_cmd, input_data=input, timeout=timeout)
 
+    async def _exec_script_file(
+        self,
+        shell: str,
+        script: str,
+        *,
+        cwd: str | None,
+        env: dict[str, str] | None,
+        user: str | None,
+        timeout: int | None,
+    ) -> ExecResult[str]:
+        """Run an oversized `<shell> -lc` script from a file streamed over stdin, keeping it out of argv."""
+        path = f"/tmp/arcloop-exec-{uuid.uuid4().hex}.sh"
+        await self.write_file(path, script)
+        try:
+            return await self.exec([shell, "-l", path], cwd=cwd, env=env, user=user, timeout=timeout)
+        finally:
+            await _run_cmd(["docker", "exec", self.container_name, "rm", "-f", path], timeout=30)
+
     async def write_file(self, file: str, contents: str | bytes) -> None:
         path = PurePosixPath(file)
         parent = str(path.parent) if str(path.parent) else "."
@@ -111,8 +141,8 @@ class ArcloopDockerSandbox(SandboxEnvironment):
         metadata: dict[str, str],
     ) -> dict[str, SandboxEnvironment]:
         del config
-        runtime_spec = json.loads(metadata.get("runtime_spec_json", "{}") or "{}")
-        case_env = json.loads(metadata.get("case_env_json", "{}") or "{}")
+        runtime_spec = orjson.loads(metadata.get("runtime_spec_json", "{}") or "{}")
+        case_env = orjson.loads(metadata.get("case_env_json", "{}") or "{}")
         if not isinstance(runtime_spec, dict):
             raise RuntimeError("E_SANDBOX_RUNTIME_SPEC_INVALID")
         if not isinstance(case_env, dict):
@@ -129,15 +159,14 @@ class ArcloopDockerSandbox(SandboxEnvironment):
         run_timeout = int(runtime_spec.get("run_timeout_seconds") or 60)
         inspect_timeout = int(runtime_spec.get("inspect_timeout_seconds") or 10)
 
-        await cls._docker_pull(image, pull_policy=pull_policy, pull_timeout=pull_timeout, inspect_timeout=inspect_timeout)
+        await cls._ensure_image(image, pull_policy=pull_policy, pull_timeout=pull_timeout, inspect_timeout=inspect_timeout)
 
         task_slug = "".join(ch for ch in task_name if ch.isalnum() or ch in {"-", "_"})[:24] or "task"
         group_key = str(metadata.get("sandbox_group_key") or "case")
         group_slug = "".join(ch for ch in group_key if ch.isalnum() or ch in {"-", "_"})[:24] or "case"
         container_name = f"inspect-sb-{task_slug}-{group_slug}"
 
-        # Always rebuild per case.
-        await _run_cmd(["docker", "rm", "-f", container_name], timeout=inspect_timeout)
+        # Always rebuild per case; sample_cleanup removes the container, so a leftover only exists after a crash.
         docker_cmd = ["docker", "run", "-d", "--name", container_name]
         # On Linux hosts, map host.docker.internal explicitly.
         # On Docker Desktop (macOS/Windows), this mapping is built-in and overriding it can break routing.
@@ -150,12 +179,10 @@ class ArcloopDockerSandbox(SandboxEnvironment):
         if docker_network:
             docker_cmd.extend(["--network", docker_network])
 
-        merged_env: dict[str, str] = {}
+        # case_env is built in a fixed order by the runner, so emit it as-is instead of sorting.
         for key, value in case_env.items():
             if isinstance(key, str):
-                merged_env[key] = str(value)
-        for key, value in sorted(merged_env.items()):
-            docker_cmd.extend(["-e", f"{key}={value}"])
+                docker_cmd.extend(("-e", f"{key}={value}"))
 
         startup_command = str(runtime_spec.get("sandbox_start_command") or runtime_spec.get("agent_command") or "").strip()
         if startup_command:
@@ -164,6 +191,10 @@ class ArcloopDockerSandbox(SandboxEnvironment):
             docker_cmd.append(image)
 
         run_result = await _run_cmd(docker_cmd, timeout=run_timeout)
+        if not run_result.success and "is already in use" in run_result.stderr:
+            logger.warning("code=SANDBOX_STALE_CONTAINER_REMOVED container=%s", container_name)
+            await _run_cmd(["docker", "rm", "-f", container_name], timeout=inspect_timeout)
+            run_result = await _run_cmd(docker_cmd, timeout=run_timeout)
         if not run_result.success:
             raise RuntimeError(f"E_DOCKER_CREATE: {run_result.stderr.strip()}")
 
@@ -217,6 +248,44 @@ class ArcloopDockerSandbox(SandboxEnvironment):
         if ids:
             await _run_cmd(["docker", "rm", "-f", *ids], timeout=30)
 
+    @classmethod
+    async def _ensure_image(
+        cls,
+        image: str,
+        *,
+        pull_policy: str,
+        pull_timeout: int,
+        inspect_timeout: int,
+    ) -> None:
+        if pull_policy == "never":
+            return
+        if pull_policy == "if-not-present" and image in _PRESENT_IMAGES:
+            return
+        key = (asyncio.get_running_loop(), image)
+        in_flight = _PULLS_IN_FLIGHT.get(key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(
+                cls._shared_pull(key, pull_policy=pull_policy, pull_timeout=pull_timeout, inspect_timeout=inspect_timeout)
+            )
+            _PULLS_IN_FLIGHT[key] = in_flight
+        # Shield: one cancelled sample must not abort the pull other samples are waiting on.
+        await asyncio.shield(in_flight)
+        _PRESENT_IMAGES.add(image)
+
+    @classmethod
+    async def _shared_pull(
+        cls,
+        key: tuple[asyncio.AbstractEventLoop, str],
+        *,
+        pull_policy: str,
+        pull_timeout: int,
+        inspect_timeout: int,
+    ) -> None:
+        try:
+            await cls._docker_pull(key[1], pull_policy=pull_policy, pull_timeout=pull_timeout, inspect_timeout=inspect_timeout)
+        finally:
+            _PULLS_IN_FLIGHT.pop(key, None)
+
     @classmethod
     async def _docker_pull(
         cls,
@@ -10,15 +10,24 @@ from .config import Settings
 
 logger = logging.getLogger(__name__)
 
+# KEYS[1]=processed key, KEYS[2]=processing key, ARGV[1]=processing ttl seconds.
+# Folds the duplicate check and the NX acquire into one atomic round trip.
+_CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return 'processed'
+end
+if redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[1]) then
+  return 'claimed'
+end
+return 'processing'
+"""
+
 
 class MessageLock(Protocol):
     def build_suffix(self, message_id: str, payload_bytes: bytes) -> str:
         ...
 
-    def already_processed(self, suffix: str) -> bool:
-        ...
-
-    def acquire_processing(self, suffix: str) -> bool:
+    def try_claim(self, suffix: str) -> bool:
         ...
 
     def mark_processed(self, suffix: str) -> None:
@@ -49,6 +58,7 @@ class RedisMessageLock:
             socket_timeout=5,
             socket_connect_timeout=5,
         )
+        self._claim_script = self._redis.register_script(_CLAIM_SCRIPT)
         self.processing_ttl_seconds = processing_ttl_seconds
         self.processed_ttl_seconds = processed_ttl_seconds
 
@@ -75,21 +85,24 @@ class RedisMessageLock:
     def processed_key(self, suffix: str) -> str:
         return f"benchmark:consumer:processed:{suffix}"
 
-    def already_processed(self, suffix: str) -> bool:
-        exists = bool(self._redis.exists(self.processed_key(suffix)))
-        if exists:
-            logger.info("code=E_DUPLICATE_MESSAGE_PROCESSED key=%s", self.processed_key(suffix))
-        return exists
-
-    def acquire_processing(self, suffix: str) -> bool:
-        key = self.processing_key(suffix)
-        locked = bool(self._redis.set(key, "1", ex=self.processing_ttl_seconds, nx=True))
-        if not locked:
-            logger.info("code=E_DUPLICATE_MESSAGE_PROCESSING key=%s", key)
-        return locked
+    def try_claim(self, suffix: str) -> bool:
+        processed_key = self.processed_key(suffix)
+        processing_key = self.processing_key(suffix)
+        outcome = self._claim_script(keys=[processed_key, processing_key], args=[self.processing_ttl_seconds])
+        if outcome == "processed":
+            logger.info("code=E_DUPLICATE_MESSAGE_PROCESSED key=%s", processed_key)
+            return False
+        if outcome != "claimed":
+            logger.info("code=E_DUPLICATE_MESSAGE_PROCESSING key=%s", processing_key)
+            return False
+        return True
 
     def mark_processed(self, suffix: str) -> None:
-        self._redis.set(self.processed_key(suffix), "1", ex=self.processed_ttl_seconds)
+        """Record the message as processed and drop the processing lock in one round trip."""
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.set(self.processed_key(suffix), "1", ex=self.processed_ttl_seconds)
+        pipe.delete(self.processing_key(suffix))
+        pipe.execute()
 
     def release_processing(self, suffix: str) -> None:
         self._redis.delete(self.processing_key(suffix))
@@ -5,6 +5,8 @@ import gzip
 import json
 from typing import Any, Protocol
 
+import orjson
+
 try:
     from google.protobuf.json_format import MessageToDict  # type: ignore
     from opentelemetry.proto.collector.logs.v1.logs_service_pb2 import (  # type: ignore
@@ -336,7 +338,7 @@ def ingest_otel_request(
             payload = _decode_trace_protobuf_payload(raw_body)
             signal = "traces"
     else:
-        parsed = json.loads(raw_body.decode("utf-8")) if raw_body else {}
+        parsed = orjson.loads(raw_body) if raw_body else {}
         payload = parsed if isinstance(parsed, dict) else {}
         signal = _detect_signal(request_path, payload)
 
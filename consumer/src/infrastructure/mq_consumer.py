@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import functools
 import logging
+import random
+import threading
 import time
 from collections.abc import Callable
 
@@ -14,16 +17,25 @@ logger = logging.getLogger(__name__)
 
 MessageHandler = Callable[[bytes], None]
 
+RECONNECT_BASE_DELAY_SECONDS = 2.0
+RECONNECT_MAX_DELAY_SECONDS = 60.0
+HEARTBEAT_SECONDS = 60
+
 
 class RabbitMqConsumer:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
 
-    def _build_connection_params(self) -> pika.URLParameters:
+    def _build_connection_params(self, *, handler_on_connection_thread: bool = False) -> pika.URLParameters:
         params = pika.URLParameters(self.settings.rabbitmq_url)
-        # Blocking callback may run for a long time, so heartbeat must be comfortably above
-        # single-case timeout to avoid broker closing the socket during message handling.
-        params.heartbeat = max(self.settings.case_timeout_seconds * 2, 600)
+        if handler_on_connection_thread:
+            # receive_once runs the handler inline, so no heartbeats go out while it works; keep the
+            # heartbeat comfortably above the single-case timeout so the broker does not drop the socket.
+            params.heartbeat = max(self.settings.case_timeout_seconds * 2, 600)
+        else:
+            # start() runs handlers on the mq-handler thread while start_consuming keeps servicing
+            # heartbeats, so a short heartbeat only has to cover the connection itself.
+            params.heartbeat = HEARTBEAT_SECONDS
         params.blocked_connection_timeout = max(self.settings.case_timeout_seconds * 2, 600)
         return params
 
@@ -57,27 +69,60 @@ class RabbitMqConsumer:
             logger.error("code=E_NACK_FAILED delivery_tag=%s err=%s", delivery_tag, exc)
             return False
 
+    def _handle_off_loop(
+        self,
+        connection: BlockingConnection,
+        channel: BlockingChannel,
+        delivery_tag: int,
+        body: bytes,
+        handler: MessageHandler,
+    ) -> None:
+        """Worker-thread body: run the handler, then hand the ack/nack back to the connection thread."""
+        error: Exception | None = None
+        try:
+            handler(body)
+        except Exception as exc:
+            error = exc
+        try:
+            connection.add_callback_threadsafe(functools.partial(self._settle, channel, delivery_tag, error))
+        except Exception as exc:
+            # Connection already gone: the unacked message is redelivered after reconnect.
+            logger.error("code=E_ACK_DISPATCH_FAILED delivery_tag=%s err=%s", delivery_tag, exc)
+
+    def _settle(self, channel: BlockingChannel, delivery_tag: int, error: Exception | None) -> None:
+        if error is None:
+            if not self._safe_ack(channel, delivery_tag):
+                raise StreamLostError("ack failed due to closed or unhealthy channel")
+            return
+        logger.error("code=E_MESSAGE_PROCESS err=%s", error)
+        if not self._safe_nack(channel, delivery_tag, requeue=False):
+            raise error
+
     def start(self, handler: MessageHandler) -> None:
-        reconnect_backoff_seconds = 2
+        reconnect_attempt = 0
         while True:
             connection: BlockingConnection | None = None
+            worker: threading.Thread | None = None
             try:
                 params = self._build_connection_params()
                 connection = pika.BlockingConnection(params)
                 channel = self._declare_channel(connection)
+                reconnect_attempt = 0
 
                 def _on_message(
                     ch: BlockingChannel, method: pika.spec.Basic.Deliver, properties: pika.BasicProperties, body: bytes
                 ) -> None:
+                    # Run the (minutes-long) handler off the connection thread so start_consuming keeps
+                    # servicing heartbeats; prefetch_count=1 keeps at most one message in flight.
+                    nonlocal worker
                     del properties
-                    try:
-                        handler(body)
-                        if not self._safe_ack(ch, method.delivery_tag):
-                            raise StreamLostError("ack failed due to closed or unhealthy channel")
-                    except Exception as exc:
-                        logger.error("code=E_MESSAGE_PROCESS err=%s", exc)
-                        if not self._safe_nack(ch, method.delivery_tag, requeue=False):
-                            raise
+                    worker = threading.Thread(
+                        target=self._handle_off_loop,
+                        args=(connection, ch, method.delivery_tag, body, handler),
+                        name="mq-handler",
+                        daemon=True,
+                    )
+                    worker.start()
 
                 channel.basic_consume(queue=self.settings.rabbitmq_experiment_queue, on_message_callback=_on_message)
                 logger.info(
@@ -88,19 +133,33 @@ class RabbitMqConsumer:
                 )
                 channel.start_consuming()
             except (AMQPConnectionError, StreamLostError, OSError, ChannelWrongStateError) as exc:
+                reconnect_attempt += 1
+                delay = _reconnect_delay_seconds(reconnect_attempt)
                 logger.error(
-                    "code=E_MQ_CONNECTION_LOST queue=%s err=%s; reconnect in %ss",
+                    "code=E_MQ_CONNECTION_LOST queue=%s attempt=%s err=%s; reconnect in %.1fs",
                     self.settings.rabbitmq_experiment_queue,
+                    reconnect_attempt,
                     exc,
-                    reconnect_backoff_seconds,
+                    delay,
                 )
-                time.sleep(reconnect_backoff_seconds)
+                # Give an in-flight delivery the reconnect delay to finish instead of waiting on top of it.
+                reconnect_at = time.monotonic() + delay
+                if worker is not None:
+                    worker.join(delay)
+                time.sleep(max(0.0, reconnect_at - time.monotonic()))
             finally:
+                # Do not hold up shutdown or reconnect on a batch that can run for minutes: its unacked
+                # delivery is redelivered once this connection closes.
+                if worker is not None and worker.is_alive():
+                    logger.warning(
+                        "code=MQ_HANDLER_IN_FLIGHT queue=%s; leaving the delivery unacked",
+                        self.settings.rabbitmq_experiment_queue,
+                    )
                 if connection is not None and connection.is_open:
                     connection.close()
 
     def receive_once(self, handler: MessageHandler, timeout_seconds: int = 10) -> bool:
-        params = self._build_connection_params()
+        params = self._build_connection_params(handler_on_connection_thread=True)
         connection = pika.BlockingConnection(params)
         channel = self._declare_channel(connection)
 
@@ -125,3 +184,9 @@ class RabbitMqConsumer:
         finally:
             if connection.is_open:
                 connection.close()
+
+
+def _reconnect_delay_seconds(attempt: int) -> float:
+    """Exponential backoff capped before jitter so consumers do not reconnect in lockstep, even at the cap."""
+    capped = min(RECONNECT_MAX_DELAY_SECONDS, RECONNECT_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+    return capped * (0.5 + 0.5 * random.random())
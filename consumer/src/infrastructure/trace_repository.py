@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import functools
 import json
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Literal, Protocol
 
 from .config import Settings
 
+_TraceEngine = Literal["postgres", "mysql"]
+
 
 @dataclass
 class TraceRepository:
@@ -24,9 +29,8 @@ class TraceRepository:
         end_ms: int,
         limit: int = 1000,
     ) -> list[dict[str, Any]]:
-        if self.settings.database_engine == "postgres":
-            return self._fetch_postgres(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
-        return self._fetch_mysql(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
+        with self.run_case_session() as traces:
+            return traces.fetch_spans(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
 
     def fetch_logs_by_run_case(
         self,
@@ -36,9 +40,62 @@ class TraceRepository:
         end_ms: int,
         limit: int = 2000,
     ) -> list[dict[str, Any]]:
+        with self.run_case_session() as traces:
+            return traces.fetch_logs(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
+
+    @contextmanager
+    def run_case_session(self) -> Iterator["RunCaseTraceSession"]:
+        """Open one DB connection for several per-run_case trace queries (e.g. logs, then spans if needed)."""
+        with self._cursor() as (engine, cur):
+            if engine == "postgres":
+                yield RunCaseTraceSession(
+                    select_logs=functools.partial(self._select_logs_postgres, cur),
+                    select_spans=functools.partial(self._select_spans_postgres, cur),
+                )
+            else:
+                yield RunCaseTraceSession(
+                    select_logs=functools.partial(self._select_logs_mysql, cur),
+                    select_spans=functools.partial(self._select_spans_mysql, cur),
+                )
+
+    @contextmanager
+    def _cursor(self) -> Iterator[tuple[_TraceEngine, Any]]:
+        """Connect to the configured trace database and yield its engine with one open cursor."""
         if self.settings.database_engine == "postgres":
-            return self._fetch_logs_postgres(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
-        return self._fetch_logs_mysql(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
+            try:
+                import psycopg  # type: ignore
+            except Exception as exc:  # pragma: no cover
+                raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres traces query") from exc
+
+            if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
+                raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
+
+            with psycopg.connect(self.settings.postgres_dsn) as conn:
+                with conn.cursor() as cur:
+                    yield "postgres", cur
+            return
+
+        try:
+            import pymysql  # type: ignore
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError("E_DB_DRIVER_MISSING: install pymysql for mysql traces query") from exc
+
+        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
+            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
+
+        conn = pymysql.connect(
+            host=self.settings.mysql_server,
+            port=self.settings.mysql_port,
+            user=self.settings.mysql_user,
+            password=self.settings.mysql_password or "",
+            database=self.settings.mysql_db,
+            autocommit=True,
+        )
+        try:
+            with conn.cursor() as cur:
+                yield "mysql", cur
+        finally:
+            conn.close()
 
     def fetch_spans_by_time_window(
         self,
@@ -62,60 +119,6 @@ class TraceRepository:
             limit=limit,
         )
 
-    def _fetch_postgres(self, *, run_case_id: int, start_ms: int, end_ms: int, limit: int) -> list[dict[str, Any]]:
-        try:
-            import psycopg  # type: ignore
-        except Exception as exc:  # pragma: no cover
-            raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres traces query") from exc
-
-        if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
-
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
-        )
-        with psycopg.connect(dsn) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT
-                      id,
-                      trace_id,
-                      span_id,
-                      parent_span_id,
-                      name,
-                      service_name,
-                      attributes,
-                      resource_attributes,
-                      scope_attributes,
-                      scope_name,
-                      scope_version,
-                      start_time,
-                      end_time,
-                      status,
-                      run_case_id,
-                      experiment_id,
-                      raw,
-                      created_at
-                    FROM otel_traces
-                    WHERE is_deleted = FALSE
-                      AND run_case_id = %s
-                      AND (
-                            (start_time IS NOT NULL AND start_time >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND start_time <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
-                         OR (created_at IS NOT NULL AND created_at >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND created_at <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
-                      )
-                    ORDER BY COALESCE(start_time, created_at) ASC, id ASC
-                    LIMIT %s
-                    """,
-                    (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
-                )
-                rows = cur.fetchall() or []
-        return [self._row_to_span_dict(row) for row in rows]
-
     def _fetch_postgres_window(
         self,
         *,
@@ -132,14 +135,7 @@ class TraceRepository:
         if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
             raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
 
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
-        )
-        with psycopg.connect(dsn) as conn:
+        with psycopg.connect(self.settings.postgres_dsn) as conn:
             with conn.cursor() as cur:
                 if service_name:
                     cur.execute(
@@ -175,63 +171,6 @@ class TraceRepository:
                 rows = cur.fetchall() or []
         return [self._row_to_span_dict(row) for row in rows]
 
-    def _fetch_mysql(self, *, run_case_id: int, start_ms: int, end_ms: int, limit: int) -> list[dict[str, Any]]:
-        try:
-            import pymysql  # type: ignore
-        except Exception as exc:  # pragma: no cover
-            raise RuntimeError("E_DB_DRIVER_MISSING: install pymysql for mysql traces query") from exc
-
-        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
-
-        conn = pymysql.connect(
-            host=self.settings.mysql_server,
-            port=self.settings.mysql_port,
-            user=self.settings.mysql_user,
-            password=self.settings.mysql_password or "",
-            database=self.settings.mysql_db,
-            autocommit=True,
-        )
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT
-                      id,
-                      trace_id,
-                      span_id,
-                      parent_span_id,
-                      name,
-                      service_name,
-                      attributes,
-                      resource_attributes,
-                      scope_attributes,
-                      scope_name,
-                      scope_version,
-                      start_time,
-                      end_time,
-                      status,
-                      run_case_id,
-                      experiment_id,
-                      raw,
-                      created_at
-                    FROM otel_traces
-                    WHERE is_deleted = 0
-                      AND run_case_id = %s
-                      AND (
-                            (start_time IS NOT NULL AND start_time >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND start_time <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
-                         OR (created_at IS NOT NULL AND created_at >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND created_at <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
-                      )
-                    ORDER BY COALESCE(start_time, created_at) ASC, id ASC
-                    LIMIT %s
-                    """,
-                    (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
-                )
-                rows = cur.fetchall() or []
-        finally:
-            conn.close()
-        return [self._row_to_span_dict(row) for row in rows]
-
     def _fetch_mysql_window(
         self,
         *,
@@ -294,85 +233,130 @@ class TraceRepository:
             conn.close()
         return [self._row_to_span_dict(row) for row in rows]
 
-    def _fetch_logs_postgres(self, *, run_case_id: int, start_ms: int, end_ms: int, limit: int) -> list[dict[str, Any]]:
-        try:
-            import psycopg  # type: ignore
-        except Exception as exc:  # pragma: no cover
-            raise RuntimeError("E_DB_DRIVER_MISSING: install psycopg[binary] for postgres logs query") from exc
+    def _select_spans_postgres(
+        self, cur: Any, *, run_case_id: int, start_ms: int, end_ms: int, limit: int
+    ) -> list[dict[str, Any]]:
+        cur.execute(
+            """
+            SELECT
+              id,
+              trace_id,
+              span_id,
+              parent_span_id,
+              name,
+              service_name,
+              attributes,
+              resource_attributes,
+              scope_attributes,
+              scope_name,
+              scope_version,
+              start_time,
+              end_time,
+              status,
+              run_case_id,
+              experiment_id,
+              raw,
+              created_at
+            FROM otel_traces
+            WHERE is_deleted = FALSE
+              AND run_case_id = %s
+              AND (
+                    (start_time IS NOT NULL AND start_time >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND start_time <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
+                 OR (created_at IS NOT NULL AND created_at >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND created_at <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
+              )
+            ORDER BY COALESCE(start_time, created_at) ASC, id ASC
+            LIMIT %s
+            """,
+            (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
+        )
+        rows = cur.fetchall() or []
+        return [self._row_to_span_dict(row) for row in rows]
 
-        if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
+    def _select_spans_mysql(
+        self, cur: Any, *, run_case_id: int, start_ms: int, end_ms: int, limit: int
+    ) -> list[dict[str, Any]]:
+        cur.execute(
+            """
+            SELECT
+              id,
+              trace_id,
+              span_id,
+              parent_span_id,
+              name,
+              service_name,
+              attributes,
+              resource_attributes,
+              scope_attributes,
+              scope_name,
+              scope_version,
+              start_time,
+              end_time,
+              status,
+              run_case_id,
+              experiment_id,
+              raw,
+              created_at
+            FROM otel_traces
+            WHERE is_deleted = 0
+              AND run_case_id = %s
+              AND (
+                    (start_time IS NOT NULL AND start_time >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND start_time <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
+                 OR (created_at IS NOT NULL AND created_at >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND created_at <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
+              )
+            ORDER BY COALESCE(start_time, created_at) ASC, id ASC
+            LIMIT %s
+            """,
+            (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
+        )
+        rows = cur.fetchall() or []
+        return [self._row_to_span_dict(row) for row in rows]
 
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
+    def _select_logs_postgres(
+        self, cur: Any, *, run_case_id: int, start_ms: int, end_ms: int, limit: int
+    ) -> list[dict[str, Any]]:
+        cur.execute(
+            """
+            SELECT id, trace_id, span_id, service_name, severity_text, severity_number,
+                   body_text, body_json, attributes, resource_attributes, scope_attributes,
+                   scope_name, scope_version, flags, dropped_attributes_count,
+                   event_time, observed_time, run_case_id, experiment_id, raw, created_at
+            FROM otel_logs
+            WHERE is_deleted = FALSE
+              AND run_case_id = %s
+              AND (
+                    (event_time IS NOT NULL AND event_time >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND event_time <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
+                 OR (created_at IS NOT NULL AND created_at >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND created_at <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
+              )
+            ORDER BY COALESCE(event_time, created_at) ASC, id ASC
+            LIMIT %s
+            """,
+            (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
         )
-        with psycopg.connect(dsn) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT id, trace_id, span_id, service_name, severity_text, severity_number,
-                           body_text, body_json, attributes, resource_attributes, scope_attributes,
-                           scope_name, scope_version, flags, dropped_attributes_count,
-                           event_time, observed_time, run_case_id, experiment_id, raw, created_at
-                    FROM otel_logs
-                    WHERE is_deleted = FALSE
-                      AND run_case_id = %s
-                      AND (
-                            (event_time IS NOT NULL AND event_time >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND event_time <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
-                         OR (created_at IS NOT NULL AND created_at >= (to_timestamp(%s / 1000.0) - interval '60 seconds') AND created_at <= (to_timestamp(%s / 1000.0) + interval '60 seconds'))
-                      )
-                    ORDER BY COALESCE(event_time, created_at) ASC, id ASC
-                    LIMIT %s
-                    """,
-                    (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
-                )
-                rows = cur.fetchall() or []
+        rows = cur.fetchall() or []
         return [self._row_to_log_dict(row) for row in rows]
 
-    def _fetch_logs_mysql(self, *, run_case_id: int, start_ms: int, end_ms: int, limit: int) -> list[dict[str, Any]]:
-        try:
-            import pymysql  # type: ignore
-        except Exception as exc:  # pragma: no cover
-            raise RuntimeError("E_DB_DRIVER_MISSING: install pymysql for mysql logs query") from exc
-
-        if not (self.settings.mysql_server and self.settings.mysql_user and self.settings.mysql_db):
-            raise RuntimeError("E_DB_CONFIG_MISSING: mysql env vars are not configured")
-
-        conn = pymysql.connect(
-            host=self.settings.mysql_server,
-            port=self.settings.mysql_port,
-            user=self.settings.mysql_user,
-            password=self.settings.mysql_password or "",
-            database=self.settings.mysql_db,
-            autocommit=True,
+    def _select_logs_mysql(
+        self, cur: Any, *, run_case_id: int, start_ms: int, end_ms: int, limit: int
+    ) -> list[dict[str, Any]]:
+        cur.execute(
+            """
+            SELECT id, trace_id, span_id, service_name, severity_text, severity_number,
+                   body_text, body_json, attributes, resource_attributes, scope_attributes,
+                   scope_name, scope_version, flags, dropped_attributes_count,
+                   event_time, observed_time, run_case_id, experiment_id, raw, created_at
+            FROM otel_logs
+            WHERE is_deleted = 0
+              AND run_case_id = %s
+              AND (
+                    (event_time IS NOT NULL AND event_time >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND event_time <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
+                 OR (created_at IS NOT NULL AND created_at >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND created_at <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
+              )
+            ORDER BY COALESCE(event_time, created_at) ASC, id ASC
+            LIMIT %s
+            """,
+            (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
         )
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    SELECT id, trace_id, span_id, service_name, severity_text, severity_number,
-                           body_text, body_json, attributes, resource_attributes, scope_attributes,
-                           scope_name, scope_version, flags, dropped_attributes_count,
-                           event_time, observed_time, run_case_id, experiment_id, raw, created_at
-                    FROM otel_logs
-                    WHERE is_deleted = 0
-                      AND run_case_id = %s
-                      AND (
-                            (event_time IS NOT NULL AND event_time >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND event_time <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
-                         OR (created_at IS NOT NULL AND created_at >= (FROM_UNIXTIME(%s / 1000) - INTERVAL 60 SECOND) AND created_at <= (FROM_UNIXTIME(%s / 1000) + INTERVAL 60 SECOND))
-                      )
-                    ORDER BY COALESCE(event_time, created_at) ASC, id ASC
-                    LIMIT %s
-                    """,
-                    (int(run_case_id), start_ms, end_ms, start_ms, end_ms, max(1, int(limit))),
-                )
-                rows = cur.fetchall() or []
-        finally:
-            conn.close()
+        rows = cur.fetchall() or []
         return [self._row_to_log_dict(row) for row in rows]
 
     def _row_to_span_dict(self, row: Any) -> dict[str, Any]:
@@ -484,6 +468,24 @@ class TraceRepository:
         return default
 
 
+class _RunCaseQuery(Protocol):
+    def __call__(self, *, run_case_id: int, start_ms: int, end_ms: int, limit: int) -> list[dict[str, Any]]: ...
+
+
+@dataclass(frozen=True)
+class RunCaseTraceSession:
+    """Per-run_case trace queries bound to the cursor opened by TraceRepository.run_case_session."""
+
+    select_logs: _RunCaseQuery
+    select_spans: _RunCaseQuery
+
+    def fetch_logs(self, *, run_case_id: int, start_ms: int, end_ms: int, limit: int = 2000) -> list[dict[str, Any]]:
+        return self.select_logs(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
+
+    def fetch_spans(self, *, run_case_id: int, start_ms: int, end_ms: int, limit: int = 1000) -> list[dict[str, Any]]:
+        return self.select_spans(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=limit)
+
+
 @dataclass
 class TraceIngestRepository:
     settings: Settings
@@ -515,15 +517,8 @@ class TraceIngestRepository:
         if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
             raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
 
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
-        )
         rows = [self._span_to_row(span) for span in spans]
-        with psycopg.connect(dsn) as conn:
+        with psycopg.connect(self.settings.postgres_dsn) as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
@@ -625,15 +620,8 @@ class TraceIngestRepository:
         if not (self.settings.postgres_server and self.settings.postgres_user and self.settings.postgres_db):
             raise RuntimeError("E_DB_CONFIG_MISSING: postgres env vars are not configured")
 
-        dsn = (
-            f"host={self.settings.postgres_server} "
-            f"port={self.settings.postgres_port} "
-            f"user={self.settings.postgres_user} "
-            f"password={self.settings.postgres_password or ''} "
-            f"dbname={self.settings.postgres_db}"
-        )
         rows = [self._log_to_row(item) for item in logs]
-        with psycopg.connect(dsn) as conn:
+        with psycopg.connect(self.settings.postgres_dsn) as conn:
             with conn.cursor() as cur:
                 cur.executemany(
                     """
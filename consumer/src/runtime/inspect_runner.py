@@ -7,7 +7,6 @@ import importlib.util
 import json
 import logging
 import os
-import subprocess
 import sys
 import threading
 import time
@@ -15,15 +14,17 @@ import uuid
 from pathlib import Path
 from typing import Any, Callable
 
+import orjson
+
 from domain.otel_mapper import map_logs_to_trajectory, map_spans_to_trajectory
-from domain.contracts import CaseExecutionResult, ExperimentRunRequested, RunCaseInput
+from domain.contracts import CaseExecutionResult, ExperimentRunRequested, MessageContractError, RunCaseInput, ScorerResult
 from infrastructure.config import Settings
 from infrastructure.docker_runner import DockerRunner
 from infrastructure.mock_gateway.runtime import start_mock_gateway
 from infrastructure.trace_repository import TraceRepository
 from runtime.evaluator_client import EvaluatorCallInput, call_evaluator
 from runtime.evaluator_client import EvaluatorDataItem, EvaluatorRun
-from runtime.runtime_command_template import render_runtime_command_template
+from runtime.runtime_command_template import assert_template_variables_declared, render_runtime_command_template
 
 logger = logging.getLogger(__name__)
 DEFAULT_SCORE_SENTINEL = -1.0
@@ -34,6 +35,7 @@ DEFAULT_EVALUATOR_MAX_RETRIES = 2
 DEFAULT_EVALUATOR_RETRY_BACKOFF_SECONDS = 1.0
 INSPECT_HEARTBEAT_SECONDS = 10
 INSPECT_STUCK_WARN_SECONDS = 90
+CASE_CANCELLED_ERROR = "E_CASE_CANCELLED: experiment manually terminated"
 
 
 class InspectRunner:
@@ -43,14 +45,20 @@ class InspectRunner:
     for all run_cases. Each case executes in order and then issues a reset command.
     """
 
-    def __init__(self, docker_runner: DockerRunner, settings: Settings) -> None:
+    def __init__(
+        self,
+        docker_runner: DockerRunner,
+        settings: Settings,
+        trace_repo: TraceRepository | None = None,
+    ) -> None:
         self.docker_runner = docker_runner
         self.settings = settings
-        self.trace_repo = TraceRepository.from_settings(settings)
+        self.trace_repo = trace_repo if trace_repo is not None else TraceRepository.from_settings(settings)
         self._scorer_executor = concurrent.futures.ThreadPoolExecutor(
             max_workers=max(1, int(settings.scorer_concurrent_cases)),
             thread_name_prefix="scorer",
         )
+        self._runtime_snapshot_cache: tuple[ExperimentRunRequested, dict[str, Any]] | None = None
         self._inspect_probe_error: str = ""
         self._has_inspect_ai = self._probe_inspect_ai()
         if self._has_inspect_ai:
@@ -84,10 +92,26 @@ class InspectRunner:
             self._inspect_probe_error = f"{type(exc).__name__}: {exc}"
             return False
 
+    def close(self) -> None:
+        """Shut down the worker-lifetime scorer pool after in-flight scorer calls finish."""
+        self._scorer_executor.shutdown(wait=True)
+
     def runtime_snapshot(self, message: ExperimentRunRequested, run_case: RunCaseInput) -> dict[str, Any]:
+        return {
+            **self._message_runtime_snapshot(message),
+            "run_case_id": run_case.run_case_id,
+            "generated_at": int(time.time()),
+        }
+
+    def _message_runtime_snapshot(self, message: ExperimentRunRequested) -> dict[str, Any]:
+        # Every run_case of a message shares the same spec hash; keep the last message's
+        # snapshot (held by identity) so a batch hashes the canonical spec only once.
+        cached = self._runtime_snapshot_cache
+        if cached is not None and cached[0] is message:
+            return cached[1]
         spec = dict(message.agent.runtime_spec_json or {})
         canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"))
-        return {
+        snapshot = {
             "runtime_spec_hash": hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
             "runtime_type": spec.get("runtime_type", "agno_docker"),
             "agent_image": spec.get("agent_image"),
@@ -95,9 +119,9 @@ class InspectRunner:
             "services": spec.get("services", []),
             "sandbox": spec.get("sandbox", {}),
             "scorers": message.scorers,
-            "run_case_id": run_case.run_case_id,
-            "generated_at": int(time.time()),
         }
+        self._runtime_snapshot_cache = (message, snapshot)
+        return snapshot
 
     def run_case(
         self,
@@ -112,6 +136,7 @@ class InspectRunner:
         message: ExperimentRunRequested,
         run_cases: list[RunCaseInput],
         progress_callback: Callable[[int, str], None] | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> dict[int, CaseExecutionResult]:
         started = time.time()
         if not self._has_inspect_ai:
@@ -122,10 +147,21 @@ class InspectRunner:
                 message=message,
                 run_cases=run_cases,
                 progress_callback=progress_callback,
+                cancel_event=cancel_event,
             )
         except Exception as exc:
             logger.warning("code=E_INSPECT_EVAL_FAILED err=%s", exc)
             failed: dict[int, CaseExecutionResult] = {}
+            if cancel_event is not None and cancel_event.is_set():
+                # The platform owns the rows of a cancelled experiment; report the cases as cancelled so
+                # the processor leaves them untouched instead of overwriting them as failed.
+                for run_case in run_cases:
+                    failed[run_case.run_case_id] = CaseExecutionResult(
+                        run_case_id=run_case.run_case_id,
+                        status="failed",
+                        error_message=CASE_CANCELLED_ERROR,
+                    )
+                return failed
             for run_case in run_cases:
                 result = CaseExecutionResult(
                     run_case_id=run_case.run_case_id,
@@ -171,6 +207,7 @@ class InspectRunner:
         message: ExperimentRunRequested,
         run_cases: list[RunCaseInput],
         progress_callback: Callable[[int, str], None] | None,
+        cancel_event: threading.Event | None = None,
     ) -> dict[int, CaseExecutionResult]:
         batch_started = time.time()
         logger.info(
@@ -200,11 +237,15 @@ class InspectRunner:
         runtime_spec = dict(message.agent.runtime_spec_json or {})
         image = str(runtime_spec.get("agent_image") or "").strip()
         if not image:
-            raise RuntimeError("E_RUNTIME_SPEC_IMAGE_REQUIRED: agent.runtime_spec_json.agent_image")
+            raise MessageContractError("E_RUNTIME_SPEC_IMAGE_REQUIRED: agent.runtime_spec_json.agent_image")
         case_exec_command_template = str(runtime_spec.get("case_exec_command") or "").strip()
         if not case_exec_command_template:
-            raise RuntimeError("E_RUNTIME_SPEC_CASE_EXEC_REQUIRED: agent.runtime_spec_json.case_exec_command")
+            raise MessageContractError("E_RUNTIME_SPEC_CASE_EXEC_REQUIRED: agent.runtime_spec_json.case_exec_command")
         after_exec_command_template = str(runtime_spec.get("after_exec_command") or "").strip()
+        # Check the per-case templates before any sandbox starts: an undeclared variable fails every case alike.
+        assert_template_variables_declared(case_exec_command_template)
+        if after_exec_command_template:
+            assert_template_variables_declared(after_exec_command_template)
 
         case_map = {rc.run_case_id: rc for rc in run_cases}
         execution: dict[int, dict[str, Any]] = {
@@ -280,6 +321,11 @@ class InspectRunner:
                 run_case = case_map[run_case_id]
                 await case_semaphore.acquire()
                 try:
+                    if cancel_event is not None and cancel_event.is_set():
+                        execution[run_case_id]["error_message"] = CASE_CANCELLED_ERROR
+                        logger.info("code=CASE_SKIPPED_CANCELLED run_case_id=%s", run_case_id)
+                        state.completed = True
+                        return state
                     mock_base_url = str(execution[run_case_id].get("mock_sidecar_endpoint") or "") or None
                     case_started = time.time()
                     case_started_ms = int(case_started * 1000)
@@ -323,7 +369,7 @@ class InspectRunner:
                         )
                     case_exec_ms = int((time.time() - case_exec_started) * 1000)
                     execution[run_case_id]["case_exec_ms"] = case_exec_ms
-                    container_logs = self._docker_container_logs(execution[run_case_id]["container_name"])
+                    container_logs = await self._docker_container_logs(execution[run_case_id]["container_name"])
                     combined_logs = raw_logs
                     if after_exec_logs:
                         combined_logs = f"{combined_logs}\n\n[after-exec]\n{after_exec_logs}".strip()
@@ -331,7 +377,8 @@ class InspectRunner:
                     output, _ = self._normalize_case_result_payload(parsed, exec_result.stdout)
                     _update_progress("otel_query", run_case_id)
                     otel_query_started = time.time()
-                    trajectory = self._collect_trajectory_from_otel(run_case_id=run_case_id)
+                    # Blocking DB I/O: run off the event loop so concurrent cases keep progressing.
+                    trajectory = await asyncio.to_thread(self._collect_trajectory_from_otel, run_case_id=run_case_id)
                     execution[run_case_id]["otel_query_ms"] = int((time.time() - otel_query_started) * 1000)
                     logs = str(parsed.get("logs")) if parsed and parsed.get("logs") else combined_logs
                     if container_logs:
@@ -392,6 +439,18 @@ class InspectRunner:
                 async def score_fn(state, target):
                     del target
                     run_case_id = int((state.metadata or {}).get("run_case_id"))  # pyright: ignore[reportArgumentType]
+                    if execution[run_case_id].get("error_message") == CASE_CANCELLED_ERROR:
+                        return Score(
+                            value=DEFAULT_SCORE_SENTINEL,
+                            answer="",
+                            explanation="E_SCORE_DEFAULT_CASE_CANCELLED",
+                            metadata={
+                                "scorer_key": key,
+                                "evaluator_id": int(scorer_meta.get("id") or 0),
+                                "evaluator_name": str(scorer_meta.get("name") or key),
+                                "raw_result": {"source": "default", "cancelled": True},
+                            },
+                        )
                     staged = CaseExecutionResult(
                         run_case_id=run_case_id,
                         status=str(execution[run_case_id].get("status") or "failed"),
@@ -477,17 +536,23 @@ class InspectRunner:
             execution[rc.run_case_id]["mock_sidecar_endpoint"] = sidecar.endpoint if sidecar else ""
 
         samples = []
+        sandbox_start_command_template = str(runtime_spec.get("sandbox_start_command") or "").strip()
+        # Without a per-case start command every sample carries the same runtime spec: serialize it once.
+        shared_runtime_spec_json = (
+            "" if sandbox_start_command_template else orjson.dumps(runtime_spec).decode()
+        )
         for rc in run_cases:
             mock_base_url = str(execution[rc.run_case_id].get("mock_sidecar_endpoint") or "") or None
-            runtime_spec_for_case = dict(runtime_spec)
-            sandbox_start_command_template = str(runtime_spec_for_case.get("sandbox_start_command") or "").strip()
+            runtime_spec_json = shared_runtime_spec_json
             if sandbox_start_command_template:
+                runtime_spec_for_case = dict(runtime_spec)
                 runtime_spec_for_case["sandbox_start_command"] = render_runtime_command_template(
                     template=sandbox_start_command_template,
                     message=message,
                     run_case=rc,
                     mock_base_url=mock_base_url,
                 )
+                runtime_spec_json = orjson.dumps(runtime_spec_for_case).decode()
             samples.append(
                 Sample(
                     id=rc.run_case_id,
@@ -498,15 +563,14 @@ class InspectRunner:
                         "sandbox_group_key": f"case-{rc.run_case_id}",
                         "trace_id": rc.trace_id or "",
                         "session_jsonl": rc.session_jsonl,
-                        "runtime_spec_json": json.dumps(runtime_spec_for_case, ensure_ascii=False),
-                        "case_env_json": json.dumps(
+                        "runtime_spec_json": runtime_spec_json,
+                        "case_env_json": orjson.dumps(
                             self._build_case_env(
                                 message,
                                 rc,
                                 mock_base_url,
-                            ),
-                            ensure_ascii=False,
-                        ),
+                            )
+                        ).decode(),
                     },
                 )
             )
@@ -546,7 +610,7 @@ class InspectRunner:
 
         eval_log = logs[0]
         eval_id = str(eval_log.eval.eval_id)
-        sample_score_rows: dict[int, list[dict[str, Any]]] = {rc.run_case_id: [] for rc in run_cases}
+        sample_score_rows: dict[int, list[ScorerResult]] = {rc.run_case_id: [] for rc in run_cases}
         sample_usage: dict[int, dict[str, Any]] = {
             rc.run_case_id: {"inspect_enabled": True, "input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
             for rc in run_cases
@@ -558,17 +622,17 @@ class InspectRunner:
                 for score_name, score_item in sample_log.scores.items():
                     scorer_key = str((score_item.metadata or {}).get("scorer_key") or score_name)
                     sample_score_rows[run_case_id].append(
-                        {
-                            "scorer_key": scorer_key,
-                            "evaluator_id": int((score_item.metadata or {}).get("evaluator_id") or 0),
-                            "evaluator_name": str((score_item.metadata or {}).get("evaluator_name") or scorer_key),
-                            "score": float(score_item.as_float()),
-                            "reason": str(score_item.explanation or ""),
-                            "raw_result": {
+                        ScorerResult(
+                            scorer_key=scorer_key,
+                            evaluator_id=int((score_item.metadata or {}).get("evaluator_id") or 0),
+                            evaluator_name=str((score_item.metadata or {}).get("evaluator_name") or scorer_key),
+                            score=float(score_item.as_float()),
+                            reason=str(score_item.explanation or ""),
+                            raw_result={
                                 "inspect_score": score_item.model_dump(),
                                 "evaluator_result": (score_item.metadata or {}).get("raw_result") or {},
                             },
-                        }
+                        )
                     )
             if sample_log.model_usage:
                 input_tokens = 0
@@ -608,7 +672,7 @@ class InspectRunner:
                 ),
                 usage=sample_usage.get(run_case.run_case_id, {"inspect_enabled": True}),
             )
-            case_result.usage["timings_ms"] = {
+            case_result.timings_ms = {
                 "sandbox_connect": int(rec.get("sandbox_connect_ms") or 0),
                 "case_exec": int(rec.get("case_exec_ms") or 0),
                 "scorer_total": int(rec.get("scorer_total_ms") or 0),
@@ -616,6 +680,8 @@ class InspectRunner:
                 "total": int(rec.get("latency_ms") or 0),
                 "scorer_breakdown": rec.get("scorer_timings_ms") or {},
             }
+            # The platform reads timings from usage_json.timings_ms.
+            case_result.usage["timings_ms"] = case_result.timings_ms
             case_result.logs = (
                 f"{case_result.logs}\n[inspect] eval_id={case_result.inspect_eval_id} sample_id={case_result.inspect_sample_id}"
             ).strip()
@@ -700,21 +766,26 @@ class InspectRunner:
         }
 
     def _parse_agent_output(self, raw_logs: str) -> dict[str, Any] | None:
-        lines = [line.strip() for line in raw_logs.splitlines() if line.strip()]
-        for line in reversed(lines):
-            if not (line.startswith("{") or line.startswith("[")):
+        # Walk line boundaries backwards over the bytes; the payload is usually the last line.
+        buf = raw_logs.encode()
+        end = len(buf)
+        while end > 0:
+            start = buf.rfind(b"\n", 0, end) + 1
+            line = buf[start:end].strip()
+            end = start - 1
+            if line[:1] not in (b"{", b"["):
                 continue
             try:
-                parsed = json.loads(line)
-            except json.JSONDecodeError:
+                parsed = orjson.loads(line)
+            except orjson.JSONDecodeError:
                 continue
             if isinstance(parsed, dict):
                 return parsed
         try:
-            parsed = json.loads(raw_logs)
+            parsed = orjson.loads(raw_logs)
             if isinstance(parsed, dict):
                 return parsed
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return None
         return None
 
@@ -764,20 +835,26 @@ class InspectRunner:
             or "connection refused" in lowered
         )
 
-    def _docker_container_logs(self, container_name: str) -> str:
+    async def _docker_container_logs(self, container_name: str) -> str:
         if not container_name:
             return ""
         try:
-            proc = subprocess.run(
-                ["docker", "logs", container_name],
-                check=False,
-                capture_output=True,
-                text=True,
-                timeout=10,
+            proc = await asyncio.create_subprocess_exec(
+                "docker",
+                "logs",
+                container_name,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
+            try:
+                stdout_b, stderr_b = await asyncio.wait_for(proc.communicate(), timeout=10)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
         except Exception as exc:
-            return f"E_DOCKER_LOGS_READ: {exc}"
-        merged = f"{proc.stdout}\n{proc.stderr}".strip()
+            return f"E_DOCKER_LOGS_READ: {exc!r}"
+        merged = f"{stdout_b.decode('utf-8', errors='replace')}\n{stderr_b.decode('utf-8', errors='replace')}".strip()
         if not merged:
             return ""
         return merged[-8000:]
@@ -789,27 +866,27 @@ class InspectRunner:
         result: CaseExecutionResult,
         *,
         inspect_enabled: bool,
-    ) -> list[dict[str, Any]]:
-        scorer_results: list[dict[str, Any]] = []
+    ) -> list[ScorerResult]:
+        scorer_results: list[ScorerResult] = []
         score_specs = message.scorers or [{"scorer_key": "task_success"}]
         for scorer in score_specs:
             scorer_key = str(scorer.get("scorer_key") or scorer.get("evaluator_key") or "default")
             score, reason, raw_result = self._score_case(scorer_key, run_case, result, scorer)
             scorer_results.append(
-                {
-                    "scorer_key": scorer_key,
-                    "evaluator_id": int(scorer.get("id") or 0),
-                    "evaluator_name": str(scorer.get("name") or scorer_key),
-                    "score": score,
-                    "reason": reason,
-                    "raw_result": raw_result
+                ScorerResult(
+                    scorer_key=scorer_key,
+                    evaluator_id=int(scorer.get("id") or 0),
+                    evaluator_name=str(scorer.get("name") or scorer_key),
+                    score=score,
+                    reason=reason,
+                    raw_result=raw_result
                     | {
                         "scorer": scorer,
                         "status": result.status,
                         "inspect_enabled": inspect_enabled,
                         "fallback": True,
                     },
-                }
+                )
             )
         return scorer_results
 
@@ -890,23 +967,16 @@ class InspectRunner:
 
     def _collect_trajectory_from_otel(self, *, run_case_id: int) -> list[dict[str, Any]]:
         now_ms = int(time.time() * 1000)
+        start_ms = now_ms - 15 * 60 * 1000
+        end_ms = now_ms + 60 * 1000
         try:
-            logs = self.trace_repo.fetch_logs_by_run_case(
-                run_case_id=run_case_id,
-                start_ms=now_ms - 15 * 60 * 1000,
-                end_ms=now_ms + 60 * 1000,
-                limit=4000,
-            )
-            mapped_logs = map_logs_to_trajectory(logs)
-            if mapped_logs:
-                return mapped_logs
-
-            spans = self.trace_repo.fetch_spans_by_run_case(
-                run_case_id=run_case_id,
-                start_ms=now_ms - 15 * 60 * 1000,
-                end_ms=now_ms + 60 * 1000,
-                limit=2000,
-            )
+            with self.trace_repo.run_case_session() as traces:
+                logs = traces.fetch_logs(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=4000)
+                mapped_logs = map_logs_to_trajectory(logs)
+                if mapped_logs:
+                    return mapped_logs
+
+                spans = traces.fetch_spans(run_case_id=run_case_id, start_ms=start_ms, end_ms=end_ms, limit=2000)
             return map_spans_to_trajectory(spans)
         except Exception as exc:
             logger.warning("code=E_OTEL_QUERY_FAILED run_case_id=%s err=%s", run_case_id, exc)
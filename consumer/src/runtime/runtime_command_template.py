@@ -4,7 +4,7 @@ from dataclasses import asdict
 import re
 from typing import Any
 
-from domain.contracts import ExperimentRunRequested, RunCaseInput
+from domain.contracts import ExperimentRunRequested, MessageContractError, RunCaseInput
 from runtime.template_catalog import list_template_variable_paths
 from runtime.template_renderer import render_as_template
 
@@ -44,7 +44,7 @@ def render_runtime_command_template(
     raw = (template or "").strip()
     if not raw:
         return ""
-    _assert_template_variables_declared(raw)
+    assert_template_variables_declared(raw)
     context = build_runtime_command_context(
         message=message,
         run_case=run_case,
@@ -54,7 +54,7 @@ def render_runtime_command_template(
     return rendered
 
 
-def _assert_template_variables_declared(template: str) -> None:
+def assert_template_variables_declared(template: str) -> None:
     for matched in _PLACEHOLDER_PATTERN.findall(template):
         if matched not in _AGENT_RUNTIME_COMMAND_VARIABLES:
-            raise ValueError(f"E_RUNTIME_COMMAND_TEMPLATE_VARIABLE_NOT_DECLARED: {matched}")
+            raise MessageContractError(f"E_RUNTIME_COMMAND_TEMPLATE_VARIABLE_NOT_DECLARED: {matched}")
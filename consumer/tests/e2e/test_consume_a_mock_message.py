@@ -25,11 +25,7 @@ class _NoopLock:
         del payload_bytes
         return message_id
 
-    def already_processed(self, suffix: str) -> bool:
-        del suffix
-        return False
-
-    def acquire_processing(self, suffix: str) -> bool:
+    def try_claim(self, suffix: str) -> bool:
         del suffix
         return True
 
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from app.cancellation import ExperimentCancelWatcher
+
+
+class _QueueStateStub:
+    def __init__(self, statuses: list[str | None]) -> None:
+        self.statuses = statuses
+        self.reads = 0
+
+    def get_experiment_queue_state(self, experiment_id: int) -> tuple[str | None, str | None]:
+        status = self.statuses[min(self.reads, len(self.statuses) - 1)]
+        self.reads += 1
+        return status, None
+
+
+def test_cancel_watcher_sets_event_on_manual_terminated() -> None:
+    db = _QueueStateStub(["consuming", "manual_terminated"])
+
+    with ExperimentCancelWatcher(db, 7, poll_interval_seconds=0.01) as watcher:
+        assert watcher.event.wait(2.0)
+
+    assert db.reads == 2
+
+
+def test_cancel_watcher_stays_clear_while_experiment_runs() -> None:
+    db = _QueueStateStub(["consuming"])
+
+    with ExperimentCancelWatcher(db, 7, poll_interval_seconds=0.01) as watcher:
+        assert not watcher.event.wait(0.05)
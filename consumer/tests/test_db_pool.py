@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+
+from infrastructure import db_pool
+from infrastructure.db_pool import ConnectionPool
+
+
+class _FakeConnection:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.commits = 0
+        self.closed = False
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _Connector:
+    def __init__(self) -> None:
+        self.opened: list[_FakeConnection] = []
+
+    def __call__(self) -> _FakeConnection:
+        conn = _FakeConnection(len(self.opened))
+        self.opened.append(conn)
+        return conn
+
+
+def test_pool_reuses_committed_connections_and_drops_failed_ones() -> None:
+    connector = _Connector()
+    pool = ConnectionPool(connector, name="test")
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    failed: _FakeConnection | None = None
+    with pytest.raises(ValueError):
+        with pool.connection() as failed:
+            raise ValueError("boom")
+    with pool.connection() as third:
+        pass
+
+    assert failed is not None
+    assert first is second is failed
+    assert failed.closed and first.commits == 2
+    assert third is connector.opened[1] and not third.closed
+
+
+def test_pool_closes_connections_idle_past_the_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = {"now": 100.0}
+    monkeypatch.setattr(db_pool.time, "monotonic", lambda: clock["now"])
+    connector = _Connector()
+    pool = ConnectionPool(connector, name="test", max_idle_seconds=60.0)
+
+    with pool.connection():
+        pass
+    clock["now"] += 61.0
+    with pool.connection() as fresh:
+        pass
+    pool.close()
+
+    assert connector.opened[0].closed
+    assert fresh is connector.opened[1] and fresh.closed
+
+
+def test_pool_drops_idle_connections_the_driver_reports_dead() -> None:
+    connector = _Connector()
+    pool = ConnectionPool(connector, name="test")
+
+    with pool.connection() as psycopg_like:
+        pass
+    psycopg_like.broken = True  # type: ignore[attr-defined]
+    with pool.connection() as pymysql_like:
+        pass
+    pymysql_like.open = False  # type: ignore[attr-defined]
+    with pool.connection() as fresh:
+        pass
+
+    assert connector.opened == [psycopg_like, pymysql_like, fresh]
+    assert psycopg_like.closed and pymysql_like.closed and not fresh.closed
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import pytest
+
+import infrastructure.db_repository as db_repository_module
+
+from domain.contracts import CaseExecutionResult, ScorerResult
+from infrastructure.config import Settings
+from infrastructure.db_pool import ConnectionPool
+from infrastructure.db_repository import DbRepository, _group_status_updates, _jsonb_param
+
+
+class _RecordingCursor:
+    def __init__(self) -> None:
+        self.statements: list[tuple[str, str, Any]] = []
+        self.prepared: list[str] = []
+
+    def execute(self, sql: str, params: Any = None, prepare: bool | None = None) -> None:
+        self.statements.append(("execute", " ".join(sql.split()), params))
+        if prepare:
+            self.prepared.append(" ".join(sql.split()))
+
+    def executemany(self, sql: str, rows: list[Any]) -> None:
+        self.statements.append(("executemany", " ".join(sql.split()), list(rows)))
+
+    def __enter__(self) -> "_RecordingCursor":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+class _PipelineConnection:
+    def __init__(self) -> None:
+        self.cur = _RecordingCursor()
+        self.events: list[str] = []
+
+    @contextmanager
+    def pipeline(self) -> Iterator[None]:
+        self.events.append(f"pipeline_enter:{len(self.cur.statements)}")
+        yield
+        self.events.append(f"pipeline_exit:{len(self.cur.statements)}")
+
+    def cursor(self) -> _RecordingCursor:
+        return self.cur
+
+    def commit(self) -> None:
+        self.events.append("commit")
+
+    def close(self) -> None:
+        self.events.append("close")
+
+
+def _settings() -> Settings:
+    return Settings(
+        rabbitmq_host="127.0.0.1",
+        rabbitmq_port=5672,
+        rabbitmq_user="guest",
+        rabbitmq_password="guest",
+        rabbitmq_vhost="/",
+        rabbitmq_experiment_queue="q",
+        concurrent_cases=1,
+        scorer_concurrent_cases=1,
+        max_message_retries=1,
+        case_timeout_seconds=120,
+        docker_network=None,
+        agent_exec_command=None,
+        docker_pull_policy="never",
+        docker_pull_timeout_seconds=30,
+        docker_run_timeout_seconds=30,
+        docker_inspect_timeout_seconds=10,
+        redis_host="127.0.0.1",
+        redis_port=6379,
+        redis_username=None,
+        redis_password=None,
+        redis_db=0,
+        redis_processing_lock_ttl_seconds=300,
+        redis_processed_ttl_seconds=86400,
+        database_engine="postgres",
+        postgres_server=None,
+        postgres_port=5432,
+        postgres_user=None,
+        postgres_password=None,
+        postgres_db=None,
+        mysql_server=None,
+        mysql_port=3306,
+        mysql_user=None,
+        mysql_password=None,
+        mysql_db=None,
+        evaluator_timeout_seconds=30,
+        evaluator_connect_timeout_seconds=5,
+        evaluator_read_timeout_seconds=30,
+        evaluator_max_retries=0,
+        evaluator_retry_backoff_seconds=0.0,
+        scorer_hard_timeout_seconds=60,
+    )
+
+
+def test_write_case_results_replaces_batch_scores_with_one_statement_per_table() -> None:
+    repo = DbRepository.from_settings(_settings())
+    cur = _RecordingCursor()
+    scored = CaseExecutionResult(
+        run_case_id=7,
+        status="success",
+        scorer_results=[
+            ScorerResult(scorer_key="a", score=1.0, reason="ok", raw_result={"x": 1}, evaluator_id=3),
+            ScorerResult(scorer_key="b", score=0.5, reason="meh"),
+        ],
+    )
+    other = CaseExecutionResult(run_case_id=8, status="success", scorer_results=[ScorerResult(scorer_key="a", score=0.0)])
+
+    repo._write_case_results_postgres(cur, [(7, scored, {}), (8, other, {})])
+
+    deletes = [(sql, params) for kind, sql, params in cur.statements if sql.startswith("DELETE")]
+    assert deletes == [
+        ("DELETE FROM run_case_scores WHERE run_case_id = ANY(%s)", ([7, 8],)),
+        ("DELETE FROM evaluate_results WHERE run_case_id = ANY(%s)", ([7, 8],)),
+    ]
+    batched = [(sql.split("(")[0], rows) for kind, sql, rows in cur.statements if kind == "executemany"]
+    assert [(table, [(*row[:4], row[4].obj) for row in rows]) for table, rows in batched] == [
+        (
+            "INSERT INTO run_case_scores",
+            [(7, "a", 1.0, "ok", b'{"x":1}'), (7, "b", 0.5, "meh", b"{}"), (8, "a", 0.0, "", b"{}")],
+        ),
+        ("INSERT INTO evaluate_results", [(7, 3, 1.0, "ok", b'{"x":1}')]),
+    ]
+    assert batched[0][1][0][4] is batched[1][1][0][4]
+    assert not any(kind == "execute" and sql.startswith("INSERT") for kind, sql, _ in cur.statements)
+    assert not any("::jsonb" in sql for _, sql, _ in cur.statements)
+
+
+def test_postgres_json_params_bind_as_jsonb_from_orjson_bytes() -> None:
+    from psycopg.adapt import PyFormat, Transformer
+
+    param = _jsonb_param({"k": ["é", 1]})
+    dumper = Transformer().get_dumper(param, PyFormat.AUTO)
+
+    assert dumper.dump(param) == '{"k":["é",1]}'.encode()
+    assert dumper.oid == 3802  # jsonb
+
+
+def test_jsonb_param_reports_missing_driver_without_psycopg(monkeypatch) -> None:
+    monkeypatch.setattr(db_repository_module, "Jsonb", None)
+
+    with pytest.raises(RuntimeError, match="E_DB_DRIVER_MISSING"):
+        _jsonb_param({})
+
+
+def test_write_case_results_sets_final_score_in_the_run_case_update() -> None:
+    repo = DbRepository.from_settings(_settings())
+    cur = _RecordingCursor()
+    scored = CaseExecutionResult(
+        run_case_id=7,
+        status="success",
+        scorer_results=[ScorerResult(scorer_key="a", score=1.0), ScorerResult(scorer_key="b", score=0.5)],
+    )
+    unscored = CaseExecutionResult(run_case_id=8, status="failed")
+
+    repo._write_case_results_mysql(cur, [(7, scored, {}), (8, unscored, {})])
+
+    updates = [params for kind, sql, params in cur.statements if sql.startswith("UPDATE run_cases")]
+    assert [params[-2:] for params in updates] == [(0.75, 7), (None, 8)]
+
+
+def test_repersist_without_scores_keeps_final_score_on_both_engines() -> None:
+    repo = DbRepository.from_settings(_settings())
+    retried = CaseExecutionResult(run_case_id=7, status="failed", error_message="E_CASE_EXEC_NON_ZERO: exit code 1")
+
+    for write in (repo._write_case_results_postgres, repo._write_case_results_mysql):
+        cur = _RecordingCursor()
+        write(cur, [(7, retried, {})])
+
+        updates = [(sql, params) for kind, sql, params in cur.statements if sql.startswith("UPDATE run_cases")]
+        assert len(updates) == 1
+        sql, params = updates[0]
+        assert "final_score = COALESCE(%s, final_score)," in sql
+        assert params[-2:] == (None, 7)
+
+
+def test_refresh_experiment_status_is_one_statement_per_engine() -> None:
+    repo = DbRepository.from_settings(_settings())
+    pg_cur = _RecordingCursor()
+    mysql_cur = _RecordingCursor()
+
+    repo._refresh_experiment_status_postgres(pg_cur, 5)
+    repo._refresh_experiment_status_mysql(mysql_cur, 5)
+
+    for cur in (pg_cur, mysql_cur):
+        assert len(cur.statements) == 1
+        kind, sql, params = cur.statements[0]
+        assert kind == "execute"
+        assert "UPDATE experiments" in sql and "manual_terminated" in sql
+        assert sql.count("%s") == len(params) == 2
+    assert "FILTER (WHERE" in pg_cur.statements[0][1]
+    assert "FILTER" not in mysql_cur.statements[0][1] and "JOIN" in mysql_cur.statements[0][1]
+
+
+def test_persist_case_results_postgres_pipelines_the_whole_batch() -> None:
+    repo = DbRepository.from_settings(_settings())
+    conn = _PipelineConnection()
+    repo._postgres_pool = ConnectionPool(lambda: conn, name="postgres")
+    items = [
+        (7, CaseExecutionResult(run_case_id=7, status="success"), {}),
+        (8, CaseExecutionResult(run_case_id=8, status="failed"), {}),
+    ]
+
+    repo.persist_case_results(experiment_id=5, items=items)
+
+    total = len(conn.cur.statements)
+    assert total > 2 and conn.cur.statements[-1][1].startswith("WITH")
+    assert conn.events[:3] == ["pipeline_enter:0", f"pipeline_exit:{total}", "commit"]
+    assert "close" not in conn.events
+
+
+def test_postgres_case_status_updates_are_prepared() -> None:
+    repo = DbRepository.from_settings(_settings())
+    cur = _RecordingCursor()
+
+    for run_case_id in (1, 2):
+        repo._execute_case_status_update_postgres(
+            cur,
+            experiment_id=5,
+            run_case_ids=[run_case_id],
+            status="running",
+            allowed_from=["pending", "queued"],
+            set_started_at=True,
+        )
+
+    assert len(cur.prepared) == 2 and cur.prepared[0] == cur.prepared[1]
+    assert cur.prepared[0].startswith("UPDATE run_cases SET status = %s")
+
+
+def test_mark_case_statuses_refreshes_only_when_case_counts_can_change() -> None:
+    repo = DbRepository.from_settings(_settings())
+    conn = _PipelineConnection()
+    repo._postgres_pool = ConnectionPool(lambda: conn, name="postgres")
+
+    repo.mark_case_statuses(experiment_id=5, updates=[(1, "trajectory"), (2, "scoring")])
+    in_flight = [sql for _, sql, _ in conn.cur.statements]
+    repo.mark_case_statuses(experiment_id=5, updates=[(1, "scoring"), (3, "running")])
+    started = [sql for _, sql, _ in conn.cur.statements][len(in_flight) :]
+
+    assert not any(sql.startswith("WITH") for sql in in_flight)
+    assert started[-1].startswith("WITH") and "UPDATE experiments" in started[-1]
+
+
+def test_group_status_updates_merges_consecutive_same_status_runs() -> None:
+    updates = [(1, "running"), (2, "running"), (1, "trajectory"), (3, "running"), (2, "trajectory"), (2, "trajectory")]
+
+    assert _group_status_updates(updates) == [
+        ("running", [1, 2]),
+        ("trajectory", [1]),
+        ("running", [3]),
+        ("trajectory", [2]),
+        ("trajectory", [2]),
+    ]
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+import infrastructure.docker_runner as docker_runner_module
+
+from domain.contracts import AgentRef, DatasetRef, ExperimentRef, ExperimentRunRequested, RunCaseInput
+from infrastructure.docker_runner import DockerRunner
+
+
+class _FakeApi:
+    def __init__(self) -> None:
+        self.calls: list[tuple[Any, ...]] = []
+        self.timeouts: list[int] = []
+        self.log_chunks: list[bytes] = [b"boot\n", b'{"output": "ok", ', b'"trajectory": [{"step": 1}]}\n']
+        self.pull_events: list[dict[str, Any]] = [{"status": "Pulling from library/alpine"}, {"status": "Done"}]
+
+    def create_host_config(self, **kwargs: Any) -> dict[str, Any]:
+        return dict(kwargs)
+
+    def create_container(self, image: str, **kwargs: Any) -> dict[str, str]:
+        self.calls.append(("create", image, kwargs["name"], kwargs["command"]))
+        return {"Id": "cid-1"}
+
+    def start(self, container: str) -> None:
+        self.calls.append(("start", container))
+
+    def wait(self, container: str, timeout: int | None = None) -> dict[str, int]:
+        self.calls.append(("wait", container, timeout))
+        return {"StatusCode": 0}
+
+    def logs(
+        self, container: str, stdout: bool = True, stderr: bool = True, stream: bool = False, follow: bool = False
+    ) -> Iterator[bytes]:
+        self.calls.append(("logs", container))
+        return iter(self.log_chunks)
+
+    def remove_container(self, container: str, force: bool = False) -> None:
+        self.calls.append(("remove", container, force))
+
+    def pull(self, image: str, stream: bool = False, decode: bool = False) -> Iterator[dict[str, Any]]:
+        self.calls.append(("pull", image, stream, decode))
+        return iter(self.pull_events)
+
+    def inspect_image(self, image: str) -> dict[str, Any]:
+        self.calls.append(("inspect_image", image))
+        raise docker_runner_module.docker.errors.NotFound(f"No such image: {image}")
+
+
+def _use_fake_api(runner: DockerRunner, api: _FakeApi) -> None:
+    def _api(timeout_seconds: int) -> _FakeApi:
+        api.timeouts.append(timeout_seconds)
+        return api
+
+    runner._api = _api  # type: ignore[method-assign]
+
+
+def _message() -> ExperimentRunRequested:
+    return ExperimentRunRequested(
+        message_type="experiment.run.requested",
+        schema_version="v2",
+        message_id="m-1",
+        produced_at="",
+        source={},
+        experiment=ExperimentRef(id=1, triggered_by="test"),
+        dataset=DatasetRef(id=1, name="d"),
+        agent=AgentRef(
+            id=1,
+            name="a",
+            agent_key="a",
+            version="v1",
+            runtime_spec_json={"agent_image": "alpine:3.20", "agent_command": "echo hi"},
+        ),
+        scorers=[],
+        run_cases=[],
+        consumer_hints={},
+    )
+
+
+def test_run_case_drives_container_lifecycle_with_per_operation_timeouts() -> None:
+    runner = DockerRunner(
+        timeout_seconds=30,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="never",
+        pull_timeout_seconds=40,
+        run_timeout_seconds=50,
+        inspect_timeout_seconds=10,
+    )
+    api = _FakeApi()
+    _use_fake_api(runner, api)
+    run_case = RunCaseInput(
+        run_case_id=5,
+        data_item_id=1,
+        attempt_no=1,
+        session_jsonl="[]",
+        user_input="ping",
+        trace_id=None,
+        reference_trajectory=None,
+        reference_output=None,
+    )
+
+    result = runner.run_case(_message(), run_case)
+
+    assert result.status == "success"
+    assert result.container_id == "cid-1"
+    assert result.output == "ok"
+    assert result.trajectory == [{"step": 1}]
+    assert [call[0] for call in api.calls] == ["create", "start", "wait", "logs", "remove"]
+    assert api.calls[0] == ("create", "alpine:3.20", "bench-case-5", ["sh", "-lc", "echo hi"])
+    # create+start, wait, logs, remove
+    assert api.timeouts == [50, 30, 30, 50]
+
+
+def test_api_client_honours_docker_env_and_is_kept_per_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    created: list[dict[str, Any]] = []
+
+    class _RecordingClient:
+        def __init__(self, **kwargs: Any) -> None:
+            created.append(kwargs)
+
+    monkeypatch.setattr(docker_runner_module, "_ReadTimeoutAPIClient", _RecordingClient)
+    monkeypatch.setenv("DOCKER_HOST", "tcp://docker.example:2375")
+    monkeypatch.delenv("DOCKER_TLS_VERIFY", raising=False)
+    monkeypatch.delenv("DOCKER_CERT_PATH", raising=False)
+    runner = DockerRunner(
+        timeout_seconds=30,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="never",
+        pull_timeout_seconds=40,
+        run_timeout_seconds=50,
+        inspect_timeout_seconds=10,
+    )
+
+    inspect_client = runner._api(10)
+    assert runner._api(10) is inspect_client
+    assert runner._api(40) is not inspect_client
+    assert [(kw["base_url"], kw["timeout"]) for kw in created] == [
+        ("tcp://docker.example:2375", 10),
+        ("tcp://docker.example:2375", 40),
+    ]
+
+
+def _pull_runner() -> DockerRunner:
+    return DockerRunner(
+        timeout_seconds=30,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="always",
+        pull_timeout_seconds=40,
+        run_timeout_seconds=50,
+        inspect_timeout_seconds=10,
+    )
+
+
+def test_docker_pull_streams_progress_and_remembers_the_image() -> None:
+    runner = _pull_runner()
+    api = _FakeApi()
+    _use_fake_api(runner, api)
+
+    runner._docker_pull("alpine:3.20")
+
+    assert api.calls == [("pull", "alpine:3.20", True, True)]
+    assert "alpine:3.20" in runner._present_images
+
+
+def test_docker_pull_raises_on_error_entry_in_the_stream() -> None:
+    runner = _pull_runner()
+    api = _FakeApi()
+    api.pull_events = [{"status": "Pulling fs layer"}, {"error": "manifest unknown"}]
+    _use_fake_api(runner, api)
+
+    with pytest.raises(RuntimeError, match="E_DOCKER_PULL: manifest unknown"):
+        runner._docker_pull("alpine:3.20")
+    assert "alpine:3.20" not in runner._present_images
+
+
+def test_docker_pull_enforces_the_pull_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = iter([0.0, 10.0, 41.0])
+    monkeypatch.setattr(docker_runner_module.time, "monotonic", lambda: next(clock))
+    runner = _pull_runner()
+    api = _FakeApi()
+    api.pull_events = [{"status": "Downloading"}, {"status": "Downloading"}, {"status": "Done"}]
+    _use_fake_api(runner, api)
+
+    with pytest.raises(RuntimeError, match="E_DOCKER_PULL_TIMEOUT: 40s"):
+        runner._docker_pull("alpine:3.20")
+    assert "alpine:3.20" not in runner._present_images
+
+
+def test_docker_pull_times_out_when_the_stream_stalls() -> None:
+    runner = _pull_runner()
+    api = _FakeApi()
+
+    def _stalled_stream() -> Iterator[dict[str, Any]]:
+        yield {"status": "Downloading"}
+        raise docker_runner_module.urllib3.exceptions.ReadTimeoutError(None, "/images/create", "Read timed out.")  # type: ignore[arg-type]
+
+    api.pull_events = _stalled_stream()  # type: ignore[assignment]
+    _use_fake_api(runner, api)
+
+    with pytest.raises(RuntimeError, match="E_DOCKER_PULL_TIMEOUT: 40s"):
+        runner._docker_pull("alpine:3.20")
+    assert "alpine:3.20" not in runner._present_images
+
+
+def test_api_client_reads_requests_sent_without_timeout_with_its_own(monkeypatch: pytest.MonkeyPatch) -> None:
+    sent: list[Any] = []
+    monkeypatch.setattr(
+        docker_runner_module.requests.Session, "send", lambda self, request, **kwargs: sent.append(kwargs.get("timeout"))
+    )
+    client = docker_runner_module._ReadTimeoutAPIClient(base_url="tcp://127.0.0.1:2375", version="1.41", timeout=40)
+
+    client.send(object(), timeout=None)
+    client.send(object(), timeout=5)
+
+    assert sent == [40, 5]
+
+
+def test_docker_exec_removes_the_container_when_the_deadline_passes() -> None:
+    runner = _pull_runner()
+    runner.timeout_seconds = 0.2  # type: ignore[assignment]
+    api = _FakeApi()
+    removed = threading.Event()
+
+    def _exec_create(container: str, cmd: list[str]) -> dict[str, str]:
+        return {"Id": "exec-1"}
+
+    def _exec_start(exec_id: str, demux: bool = False) -> tuple[bytes, bytes]:
+        removed.wait(5)
+        return b"", b""
+
+    def _remove_container(container: str, force: bool = False) -> None:
+        api.calls.append(("remove", container, force))
+        removed.set()
+
+    api.exec_create = _exec_create  # type: ignore[attr-defined]
+    api.exec_start = _exec_start  # type: ignore[attr-defined]
+    api.exec_inspect = lambda exec_id: {"ExitCode": None}  # type: ignore[attr-defined]
+    api.remove_container = _remove_container  # type: ignore[method-assign]
+    _use_fake_api(runner, api)
+
+    with pytest.raises(RuntimeError, match="E_DOCKER_EXEC_TIMEOUT: 0.2s container=c"):
+        runner._docker_exec("c", "sleep 600")
+    assert api.calls == [("remove", "c", True)]
+    assert not any(thread.name == "docker-c" for thread in threading.enumerate())
+
+
+def test_docker_remove_treats_a_missing_container_as_removed(caplog: pytest.LogCaptureFixture) -> None:
+    runner = _pull_runner()
+    api = _FakeApi()
+
+    def _remove_container(container: str, force: bool = False) -> None:
+        raise docker_runner_module.docker.errors.NotFound(f"No such container: {container}")
+
+    api.remove_container = _remove_container  # type: ignore[method-assign]
+    _use_fake_api(runner, api)
+
+    runner._docker_remove("bench-case-5")
+
+    assert "E_DOCKER_RM_FAILED" not in caplog.text
+
+
+def test_parse_agent_output_returns_last_json_object_line() -> None:
+    runner = DockerRunner(
+        timeout_seconds=30,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="never",
+        pull_timeout_seconds=30,
+        run_timeout_seconds=30,
+        inspect_timeout_seconds=10,
+    )
+    logs = 'boot\n{"output": "first"}\n  {"output": "last"}  \r\n[1, 2]\n{broken\ntrailing text\n\n'
+
+    assert runner._parse_agent_output(logs) == {"output": "last"}
+    assert runner._parse_agent_output('{"output": "only"}') == {"output": "only"}
+    assert runner._parse_agent_output("no json here\n") is None
+
+
+def test_docker_logs_keeps_only_the_tail(monkeypatch) -> None:
+    monkeypatch.setattr(docker_runner_module, "AGENT_LOG_TAIL_BYTES", 16)
+    runner = DockerRunner(
+        timeout_seconds=30,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="never",
+        pull_timeout_seconds=30,
+        run_timeout_seconds=30,
+        inspect_timeout_seconds=10,
+    )
+    api = _FakeApi()
+    api.log_chunks = [b"x" * 10, b"y" * 10, b"\n", b'{"a": 1}\n']
+    _use_fake_api(runner, api)
+
+    _, logs = runner._docker_logs("c")
+
+    assert logs == 'yyyyyy\n{"a": 1}'
+    assert runner._parse_agent_output(logs) == {"a": 1}
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+from contextlib import contextmanager
+import threading
+from pathlib import Path
 from typing import Any
 
-from domain.contracts import CaseExecutionResult, RunCaseInput
+import pytest
+
+from domain.contracts import (
+    AgentRef,
+    CaseExecutionResult,
+    DatasetRef,
+    ExperimentRef,
+    ExperimentRunRequested,
+    RunCaseInput,
+)
 from infrastructure.config import Settings
 from infrastructure.docker_runner import DockerRunner
-from runtime.inspect_runner import InspectRunner
+from runtime.inspect_runner import CASE_CANCELLED_ERROR, InspectRunner
 
 
 def _settings() -> Settings:
@@ -119,3 +132,148 @@ def test_score_case_passes_data_item_and_run_context(monkeypatch) -> None:
     assert payload.run.status == "success"
     assert payload.run.logs == "case logs"
     assert payload.run.latency_ms == 88
+
+
+class _FakeTraceSession:
+    def __init__(self, calls: list[str]) -> None:
+        self.calls = calls
+
+    def fetch_logs(self, **kwargs: Any) -> list[dict[str, Any]]:
+        self.calls.append("logs")
+        return []
+
+    def fetch_spans(self, **kwargs: Any) -> list[dict[str, Any]]:
+        self.calls.append("spans")
+        return []
+
+
+class _FakeTraceRepo:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    @contextmanager
+    def run_case_session(self) -> Iterator[_FakeTraceSession]:
+        self.calls.append("connect")
+        yield _FakeTraceSession(self.calls)
+
+
+def test_collect_trajectory_queries_logs_and_spans_on_one_connection() -> None:
+    docker_runner = DockerRunner(
+        timeout_seconds=120,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="never",
+        pull_timeout_seconds=30,
+        run_timeout_seconds=30,
+        inspect_timeout_seconds=10,
+    )
+    trace_repo = _FakeTraceRepo()
+    runner = InspectRunner(docker_runner=docker_runner, settings=_settings(), trace_repo=trace_repo)  # type: ignore[arg-type]
+
+    assert runner._collect_trajectory_from_otel(run_case_id=7) == []
+    assert trace_repo.calls == ["connect", "logs", "spans"]
+
+
+def test_run_cases_fails_every_case_with_the_contract_code_for_undeclared_template_variables(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    for name in ("INSPECT_LOG_DIR", "INSPECT_TRACE_FILE", "PYTEST_CURRENT_TEST"):
+        monkeypatch.setenv(name, "")
+    docker_runner = DockerRunner(
+        timeout_seconds=120,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="never",
+        pull_timeout_seconds=30,
+        run_timeout_seconds=30,
+        inspect_timeout_seconds=10,
+    )
+    runner = InspectRunner(docker_runner=docker_runner, settings=_settings(), trace_repo=_FakeTraceRepo())  # type: ignore[arg-type]
+    if not runner._has_inspect_ai:
+        pytest.skip("inspect_ai is not available")
+    run_case = RunCaseInput(
+        run_case_id=1,
+        data_item_id=100,
+        attempt_no=1,
+        session_jsonl="[]",
+        user_input="hello",
+        trace_id=None,
+        reference_trajectory=None,
+        reference_output=None,
+    )
+    message = ExperimentRunRequested(
+        message_type="experiment.run.requested",
+        schema_version="v2",
+        message_id="m-1",
+        produced_at="",
+        source={},
+        experiment=ExperimentRef(id=1, triggered_by="test"),
+        dataset=DatasetRef(id=1, name="d"),
+        agent=AgentRef(
+            id=1,
+            name="a",
+            agent_key="a",
+            version="v1",
+            runtime_spec_json={"agent_image": "alpine:3.20", "case_exec_command": "run {{run_case.missing}}"},
+        ),
+        scorers=[],
+        run_cases=[run_case],
+        consumer_hints={},
+    )
+
+    results = runner.run_cases(message, [run_case])
+
+    assert results[1].status == "failed"
+    assert results[1].error_message == "E_RUNTIME_COMMAND_TEMPLATE_VARIABLE_NOT_DECLARED: run_case.missing"
+
+
+def test_run_cases_reports_cancelled_cases_when_the_eval_fails_after_cancel() -> None:
+    docker_runner = DockerRunner(
+        timeout_seconds=120,
+        docker_network=None,
+        agent_exec_command=None,
+        pull_policy="never",
+        pull_timeout_seconds=30,
+        run_timeout_seconds=30,
+        inspect_timeout_seconds=10,
+    )
+    runner = InspectRunner(docker_runner=docker_runner, settings=_settings(), trace_repo=_FakeTraceRepo())  # type: ignore[arg-type]
+    runner._has_inspect_ai = True
+    cancel_event = threading.Event()
+
+    def _cancelled_eval(**kwargs: Any) -> dict[int, CaseExecutionResult]:
+        cancel_event.set()
+        raise RuntimeError("eval interrupted")
+
+    runner._run_inspect_eval_batch = _cancelled_eval  # type: ignore[method-assign]
+    run_cases = [
+        RunCaseInput(
+            run_case_id=run_case_id,
+            data_item_id=100,
+            attempt_no=1,
+            session_jsonl="[]",
+            user_input="hello",
+            trace_id=None,
+            reference_trajectory=None,
+            reference_output=None,
+        )
+        for run_case_id in (1, 2)
+    ]
+    message = ExperimentRunRequested(
+        message_type="experiment.run.requested",
+        schema_version="v2",
+        message_id="m-1",
+        produced_at="",
+        source={},
+        experiment=ExperimentRef(id=1, triggered_by="test"),
+        dataset=DatasetRef(id=1, name="d"),
+        agent=AgentRef(id=1, name="a", agent_key="a", version="v1", runtime_spec_json={"agent_image": "alpine:3.20"}),
+        scorers=[],
+        run_cases=run_cases,
+        consumer_hints={},
+    )
+
+    results = runner.run_cases(message, run_cases, cancel_event=cancel_event)
+
+    assert [results[run_case_id].error_message for run_case_id in (1, 2)] == [CASE_CANCELLED_ERROR] * 2
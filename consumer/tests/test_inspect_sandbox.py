@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+from inspect_ai.util import ExecResult
+
+from infrastructure import inspect_sandbox
+from infrastructure.inspect_sandbox import ArcloopDockerSandbox
+
+
+def test_ensure_image_pulls_once_for_concurrent_and_later_samples(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(inspect_sandbox, "_PRESENT_IMAGES", set())
+    monkeypatch.setattr(inspect_sandbox, "_PULLS_IN_FLIGHT", {})
+    pulls: list[str] = []
+
+    async def _fake_pull(image: str, **kwargs: object) -> None:
+        pulls.append(image)
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(ArcloopDockerSandbox, "_docker_pull", staticmethod(_fake_pull))
+
+    async def _run() -> None:
+        kwargs = {"pull_policy": "if-not-present", "pull_timeout": 10, "inspect_timeout": 10}
+        await asyncio.gather(*(ArcloopDockerSandbox._ensure_image("agent:1", **kwargs) for _ in range(5)))
+        await ArcloopDockerSandbox._ensure_image("agent:1", **kwargs)
+
+    asyncio.run(_run())
+
+    assert pulls == ["agent:1"]
+    assert inspect_sandbox._PULLS_IN_FLIGHT == {}
+
+
+def test_ensure_image_drops_failed_pull_and_retries_on_a_new_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(inspect_sandbox, "_PRESENT_IMAGES", set())
+    monkeypatch.setattr(inspect_sandbox, "_PULLS_IN_FLIGHT", {})
+    pulls: list[str] = []
+
+    async def _fake_pull(image: str, **kwargs: object) -> None:
+        pulls.append(image)
+        if len(pulls) == 1:
+            raise RuntimeError("E_DOCKER_PULL: boom")
+
+    monkeypatch.setattr(ArcloopDockerSandbox, "_docker_pull", staticmethod(_fake_pull))
+    kwargs = {"pull_policy": "if-not-present", "pull_timeout": 10, "inspect_timeout": 10}
+
+    with pytest.raises(RuntimeError, match="E_DOCKER_PULL"):
+        asyncio.run(ArcloopDockerSandbox._ensure_image("agent:1", **kwargs))
+    assert inspect_sandbox._PULLS_IN_FLIGHT == {}
+
+    asyncio.run(ArcloopDockerSandbox._ensure_image("agent:1", **kwargs))
+
+    assert pulls == ["agent:1", "agent:1"]
+    assert inspect_sandbox._PULLS_IN_FLIGHT == {}
+
+
+def test_sample_init_removes_stale_container_only_on_name_conflict(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(inspect_sandbox, "_PRESENT_IMAGES", {"agent:1"})
+    commands: list[list[str]] = []
+    run_attempts = {"count": 0}
+
+    async def _fake_run_cmd(cmd: list[str], **kwargs: object) -> ExecResult[str]:
+        commands.append(cmd)
+        if cmd[:2] == ["docker", "run"]:
+            run_attempts["count"] += 1
+            if run_attempts["count"] == 1:
+                return ExecResult(success=False, returncode=125, stdout="", stderr="name is already in use by container")
+        if cmd[:2] == ["docker", "inspect"]:
+            return ExecResult(success=True, returncode=0, stdout="true\n", stderr="")
+        return ExecResult(success=True, returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(inspect_sandbox, "_run_cmd", _fake_run_cmd)
+    metadata = {"runtime_spec_json": json.dumps({"agent_image": "agent:1"}), "sandbox_group_key": "case-1"}
+
+    asyncio.run(ArcloopDockerSandbox.sample_init("task", None, metadata))
+
+    assert [cmd[:3] for cmd in commands] == [
+        ["docker", "run", "-d"],
+        ["docker", "rm", "-f"],
+        ["docker", "run", "-d"],
+        ["docker", "inspect", "inspect-sb-task-case-1"],
+    ]
+
+
+def test_exec_moves_oversized_shell_script_out_of_argv(monkeypatch: pytest.MonkeyPatch) -> None:
+    commands: list[tuple[list[str], object]] = []
+
+    async def _fake_run_cmd(cmd: list[str], **kwargs: object) -> ExecResult[str]:
+        commands.append((cmd, kwargs.get("input_data")))
+        return ExecResult(success=True, returncode=0, stdout="ok", stderr="")
+
+    monkeypatch.setattr(inspect_sandbox, "_run_cmd", _fake_run_cmd)
+    sandbox = ArcloopDockerSandbox("c1")
+    script = "echo " + "x" * (inspect_sandbox._INLINE_SCRIPT_MAX_BYTES + 1)
+
+    result = asyncio.run(sandbox.exec(["sh", "-lc", script], env={"A": "1"}, timeout=5))
+
+    assert result.stdout == "ok"
+    assert all(len(arg) <= inspect_sandbox._INLINE_SCRIPT_MAX_BYTES for cmd, _ in commands for arg in cmd)
+    write_cmd, payload = commands[1]
+    path = write_cmd[-1].split("cat > ", 1)[1]
+    assert payload == script.encode("utf-8")
+    assert commands[2][0] == ["docker", "exec", "-e", "A=1", "c1", "sh", "-l", path]
+    assert commands[3][0] == ["docker", "exec", "c1", "rm", "-f", path]
@@ -0,0 +1,36 @@
+import logging
+import queue
+
+from app.logging_setup import DropOldestQueueHandler, LogContextFilter, log_context
+
+
+def _record(msg: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, None, None)
+
+
+def test_drop_oldest_queue_handler_evicts_oldest_when_full() -> None:
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=2)
+    handler = DropOldestQueueHandler(log_queue)
+
+    for msg in ("a", "b", "c"):
+        handler.handle(_record(msg))
+
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["b", "c"]
+    assert log_queue.empty()
+
+
+def test_log_context_filter_stamps_bound_fields_until_context_exits() -> None:
+    context_filter = LogContextFilter()
+
+    with log_context(experiment_id=7, message_id="m-1"):
+        with log_context(run_case_id=3):
+            inner = _record("inner")
+            context_filter.filter(inner)
+        outer = _record("outer")
+        context_filter.filter(outer)
+    after = _record("after")
+    context_filter.filter(after)
+
+    assert getattr(inner, "log_context") == " experiment_id=7 message_id=m-1 run_case_id=3"
+    assert getattr(outer, "log_context") == " experiment_id=7 message_id=m-1"
+    assert getattr(after, "log_context") == ""
@@ -3,6 +3,8 @@ from __future__ import annotations
 from types import SimpleNamespace
 from typing import Any
 
+import pytest
+
 from app.message_processor import MessageProcessor
 from domain.contracts import (
     AgentRef,
@@ -11,17 +13,16 @@ from domain.contracts import (
     ExperimentRef,
     ExperimentRunRequested,
     RunCaseInput,
+    ScorerResult,
 )
+from runtime.inspect_runner import CASE_CANCELLED_ERROR
 
 
 class _NoopLock:
     def build_suffix(self, message_id: str, body: bytes) -> str:
         return f"{message_id}:{len(body)}"
 
-    def already_processed(self, suffix: str) -> bool:
-        return False
-
-    def acquire_processing(self, suffix: str) -> bool:
+    def try_claim(self, suffix: str) -> bool:
         return True
 
     def mark_processed(self, suffix: str) -> None:
@@ -35,14 +36,28 @@ class _DbStub:
     def __init__(self) -> None:
         self.events: list[tuple[Any, ...]] = []
 
+    def get_experiment_queue_state(self, experiment_id: int) -> tuple[str | None, str | None]:
+        return None, None
+
     def mark_cases_queued(self, *, experiment_id: int, run_case_ids: list[int]) -> None:
         self.events.append(("queued", experiment_id, tuple(run_case_ids)))
 
     def mark_case_status(self, *, experiment_id: int, run_case_id: int, status: str) -> None:
         self.events.append(("status", experiment_id, run_case_id, status))
 
-    def persist_case_result(self, *, experiment_id: int, run_case_id: int, result: CaseExecutionResult, runtime_snapshot: dict[str, Any]) -> None:
-        self.events.append(("persist", experiment_id, run_case_id, result.status, bool(runtime_snapshot)))
+    def mark_case_statuses(self, *, experiment_id: int, updates: list[tuple[int, str]]) -> None:
+        for run_case_id, status in updates:
+            self.events.append(("status", experiment_id, run_case_id, status))
+
+    def persist_case_results(
+        self,
+        *,
+        experiment_id: int,
+        items: list[tuple[int, CaseExecutionResult, dict[str, Any]]],
+    ) -> None:
+        self.events.append(("persist_batch", experiment_id, len(items)))
+        for run_case_id, result, runtime_snapshot in items:
+            self.events.append(("persist", experiment_id, run_case_id, result.status, bool(runtime_snapshot)))
 
 
 class _RunnerStub:
@@ -54,6 +69,7 @@ class _RunnerStub:
         message: ExperimentRunRequested,
         run_cases: list[RunCaseInput],
         progress_callback=None,
+        cancel_event=None,
     ) -> dict[int, CaseExecutionResult]:
         results: dict[int, CaseExecutionResult] = {}
         for rc in run_cases:
@@ -67,7 +83,7 @@ class _RunnerStub:
                 status="success",
                 trajectory=[{"step": 1}],
                 output={"ok": True},
-                scorer_results=[{"scorer_key": "task_success", "score": 1.0, "reason": "ok", "raw_result": {}}],
+                scorer_results=[ScorerResult(scorer_key="task_success", score=1.0, reason="ok")],
             )
         return results
 
@@ -132,3 +148,112 @@ def test_message_processor_case_status_flows_from_queued_to_scoring() -> None:
     assert ("status", 101, 2, "scoring") in db.events
     assert ("persist", 101, 1, "success", True) in db.events
     assert ("persist", 101, 2, "success", True) in db.events
+    assert [event for event in db.events if event[0] == "persist_batch"] == [("persist_batch", 101, 2)]
+
+
+class _InvalidTemplateRunner(_RunnerStub):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def run_cases(
+        self,
+        message: ExperimentRunRequested,
+        run_cases: list[RunCaseInput],
+        progress_callback=None,
+        cancel_event=None,
+    ) -> dict[int, CaseExecutionResult]:
+        self.calls += 1
+        return {
+            rc.run_case_id: CaseExecutionResult(
+                run_case_id=rc.run_case_id,
+                status="failed",
+                error_message="E_RUNTIME_COMMAND_TEMPLATE_VARIABLE_NOT_DECLARED: run_case.missing",
+            )
+            for rc in run_cases
+        }
+
+
+def test_message_processor_does_not_retry_contract_case_failures() -> None:
+    runner = _InvalidTemplateRunner()
+    db = _DbStub()
+    settings = SimpleNamespace(max_message_retries=3, concurrent_cases=2)
+    processor = MessageProcessor(settings=settings, runner=runner, lock=_NoopLock(), db=db)
+
+    with pytest.raises(RuntimeError, match="E_RUN_NON_RETRYABLE: E_MESSAGE_CONTRACT: 2/2 run cases failed"):
+        processor._process_message(_build_message())
+    assert runner.calls == 1
+    assert [event[2:4] for event in db.events if event[0] == "persist"] == [(1, "failed"), (2, "failed")]
+
+
+class _FlakyRunner(_RunnerStub):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def run_cases(
+        self,
+        message: ExperimentRunRequested,
+        run_cases: list[RunCaseInput],
+        progress_callback=None,
+        cancel_event=None,
+    ) -> dict[int, CaseExecutionResult]:
+        self.calls += 1
+        raise KeyError("run_case_id")
+
+
+def test_message_processor_retries_errors_outside_the_message_contract(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("app.message_processor.time.sleep", lambda _seconds: None)
+    runner = _FlakyRunner()
+    settings = SimpleNamespace(max_message_retries=3, concurrent_cases=2)
+    processor = MessageProcessor(settings=settings, runner=runner, lock=_NoopLock(), db=_DbStub())
+
+    with pytest.raises(RuntimeError, match="E_RUN_RETRIES_EXCEEDED"):
+        processor._process_message(_build_message())
+    assert runner.calls == 3
+
+
+class _StatusFlushFailingDb(_DbStub):
+    def mark_case_statuses(self, *, experiment_id: int, updates: list[tuple[int, str]]) -> None:
+        raise RuntimeError("db down")
+
+
+def test_message_processor_persists_results_when_status_flush_fails() -> None:
+    db = _StatusFlushFailingDb()
+    settings = SimpleNamespace(max_message_retries=1, concurrent_cases=2)
+    processor = MessageProcessor(settings=settings, runner=_RunnerStub(), lock=_NoopLock(), db=db)
+
+    processor._execute_cases(_build_message())
+
+    persisted = [event for event in db.events if event[0] == "persist"]
+    assert persisted == [("persist", 101, 1, "success", True), ("persist", 101, 2, "success", True)]
+
+
+class _CancelledRunner(_RunnerStub):
+    def run_cases(
+        self,
+        message: ExperimentRunRequested,
+        run_cases: list[RunCaseInput],
+        progress_callback=None,
+        cancel_event=None,
+    ) -> dict[int, CaseExecutionResult]:
+        assert cancel_event is not None
+        first, *rest = run_cases
+        results = super().run_cases(message, [first], progress_callback=progress_callback)
+        cancel_event.set()
+        for rc in rest:
+            results[rc.run_case_id] = CaseExecutionResult(
+                run_case_id=rc.run_case_id,
+                status="failed",
+                error_message=CASE_CANCELLED_ERROR,
+            )
+        return results
+
+
+def test_message_processor_persists_only_finished_cases_when_experiment_cancelled_mid_run() -> None:
+    db = _DbStub()
+    settings = SimpleNamespace(max_message_retries=1, concurrent_cases=2)
+    processor = MessageProcessor(settings=settings, runner=_CancelledRunner(), lock=_NoopLock(), db=db)
+
+    processor._execute_cases(_build_message())
+
+    persisted = [event for event in db.events if event[0] == "persist"]
+    assert persisted == [("persist", 101, 1, "success", True)]
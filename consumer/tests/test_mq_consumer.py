@@ -1,5 +1,12 @@
+import random
+
 from infrastructure.config import Settings
-from infrastructure.mq_consumer import RabbitMqConsumer
+from infrastructure.mq_consumer import (
+    HEARTBEAT_SECONDS,
+    RECONNECT_MAX_DELAY_SECONDS,
+    RabbitMqConsumer,
+    _reconnect_delay_seconds,
+)
 
 
 class _FakeChannel:
@@ -60,18 +67,24 @@ def _settings(case_timeout_seconds: int = 180) -> Settings:
     )
 
 
-def test_build_connection_params_heartbeat_floor() -> None:
-    consumer = RabbitMqConsumer(_settings(case_timeout_seconds=120))
+def test_build_connection_params_uses_short_heartbeat_when_handlers_run_off_thread() -> None:
+    consumer = RabbitMqConsumer(_settings(case_timeout_seconds=400))
     params = consumer._build_connection_params()
+    assert params.heartbeat == HEARTBEAT_SECONDS
+    assert params.blocked_connection_timeout == 800
+
+
+def test_build_connection_params_inline_handler_heartbeat_floor() -> None:
+    consumer = RabbitMqConsumer(_settings(case_timeout_seconds=120))
+    params = consumer._build_connection_params(handler_on_connection_thread=True)
     assert params.heartbeat == 600
     assert params.blocked_connection_timeout == 600
 
 
-def test_build_connection_params_heartbeat_scale_with_timeout() -> None:
+def test_build_connection_params_inline_handler_heartbeat_scale_with_timeout() -> None:
     consumer = RabbitMqConsumer(_settings(case_timeout_seconds=400))
-    params = consumer._build_connection_params()
+    params = consumer._build_connection_params(handler_on_connection_thread=True)
     assert params.heartbeat == 800
-    assert params.blocked_connection_timeout == 800
 
 
 def test_safe_ack_returns_false_when_channel_closed() -> None:
@@ -86,3 +99,51 @@ def test_safe_nack_returns_false_when_channel_closed() -> None:
     ok = RabbitMqConsumer._safe_nack(channel, 12, requeue=False)
     assert ok is False
     assert channel.nacks == []
+
+
+class _InlineConnection:
+    def add_callback_threadsafe(self, callback) -> None:
+        callback()
+
+
+def test_handle_off_loop_acks_after_handler_succeeds() -> None:
+    consumer = RabbitMqConsumer(_settings())
+    channel = _FakeChannel(is_open=True)
+    received: list[bytes] = []
+
+    consumer._handle_off_loop(_InlineConnection(), channel, 21, b"{}", received.append)
+
+    assert received == [b"{}"]
+    assert channel.acks == [21]
+    assert channel.nacks == []
+
+
+def test_handle_off_loop_nacks_without_requeue_when_handler_fails() -> None:
+    consumer = RabbitMqConsumer(_settings())
+    channel = _FakeChannel(is_open=True)
+
+    def _fail(body: bytes) -> None:
+        raise RuntimeError("boom")
+
+    consumer._handle_off_loop(_InlineConnection(), channel, 22, b"{}", _fail)
+
+    assert channel.acks == []
+    assert channel.nacks == [(22, False)]
+
+
+def test_reconnect_delay_grows_exponentially_and_is_capped() -> None:
+    for _ in range(50):
+        assert 1.0 <= _reconnect_delay_seconds(1) <= 2.0
+        assert 4.0 <= _reconnect_delay_seconds(3) <= 8.0
+        assert 30.0 <= _reconnect_delay_seconds(6) <= RECONNECT_MAX_DELAY_SECONDS
+        assert 30.0 <= _reconnect_delay_seconds(20) <= RECONNECT_MAX_DELAY_SECONDS
+
+
+def test_reconnect_delay_keeps_jitter_spread_at_the_cap(monkeypatch) -> None:
+    monkeypatch.setattr(random, "random", lambda: 0.0)
+    low = _reconnect_delay_seconds(20)
+    monkeypatch.setattr(random, "random", lambda: 0.5)
+    mid = _reconnect_delay_seconds(20)
+
+    assert low == RECONNECT_MAX_DELAY_SECONDS * 0.5
+    assert low < mid < RECONNECT_MAX_DELAY_SECONDS
@@ -1,4 +1,6 @@
-from domain.otel_mapper import map_spans_to_trajectory
+from datetime import datetime
+
+from domain.otel_mapper import _pick_key_attributes, _to_epoch_ms, map_logs_to_trajectory, map_spans_to_trajectory
 
 
 def test_map_spans_to_trajectory_orders_and_computes_latency() -> None:
@@ -32,3 +34,43 @@ def test_map_spans_to_trajectory_orders_and_computes_latency() -> None:
     assert trajectory[1]["span_id"] == "b"
     assert trajectory[1]["latency_ms"] == 1000
     assert trajectory[1]["attributes"]["tool.name"] == "search"
+
+
+def test_pick_key_attributes_keeps_declared_order() -> None:
+    attributes = {"final_answer": "42", "other": 1, "query": "q", "model": "m", "tool.name": "search"}
+
+    picked = _pick_key_attributes(attributes)
+
+    assert list(picked) == ["tool.name", "model", "query", "final_answer"]
+
+
+def test_to_epoch_ms_fast_path_matches_fromisoformat() -> None:
+    for text in (
+        "1970-01-01T00:00:00Z",
+        "2000-02-29T23:59:59.999Z",
+        "2024-12-31T12:34:56.5Z",
+        "2026-02-28T10:00:02.123456Z",
+        "2100-03-01T00:00:00.000000001Z",
+    ):
+        expected = int(datetime.fromisoformat(text[:-1] + "+00:00").replace(microsecond=0).timestamp()) * 1000
+        expected += int(text[20:-1][:3].ljust(3, "0")) if len(text) > 20 else 0
+        assert _to_epoch_ms(text) == expected
+
+
+def test_to_epoch_ms_falls_back_for_offsets_and_invalid_values() -> None:
+    assert _to_epoch_ms("2026-02-28T18:00:02+08:00") == _to_epoch_ms("2026-02-28T10:00:02Z")
+    assert _to_epoch_ms("2026-13-01T00:00:00Z") == 0
+    assert _to_epoch_ms("2026-02-29T00:00:00Z") == 0
+    assert _to_epoch_ms("not-a-timestamp") == 0
+
+
+def test_map_logs_to_trajectory_orders_by_event_time() -> None:
+    logs = [
+        {"event_time": "2026-02-28T10:00:02Z", "trace_id": "t", "span_id": "b", "severity_text": "INFO", "body_text": "second"},
+        {"event_time": "2026-02-28T10:00:01Z", "trace_id": "t", "span_id": "a", "severity_text": "INFO", "body_text": "first"},
+    ]
+
+    trajectory = map_logs_to_trajectory(logs)
+    assert [step["span_id"] for step in trajectory] == ["a", "b"]
+    assert trajectory[0]["start_time_ms"] == trajectory[0]["end_time_ms"] == _to_epoch_ms("2026-02-28T10:00:01Z")
+    assert trajectory[0]["events"][0]["attributes"][0] == {"key": "body", "value": "first"}
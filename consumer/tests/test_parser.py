@@ -1,3 +1,6 @@
+import pytest
+
+from domain.contracts import MessageContractError
 from domain.parser import parse_message
 
 
@@ -46,3 +49,16 @@ def test_parse_message_with_mock_config() -> None:
     assert msg.run_cases[0].mock_config is not None
     assert msg.run_cases[0].mock_config.passthrough is False
     assert msg.run_cases[0].mock_config.rules[0].match.path == "/healthz"
+
+
+def test_parse_message_wraps_payload_errors_as_contract_errors() -> None:
+    payload = {
+        "message_type": "experiment.run.requested",
+        "schema_version": "v2",
+        "experiment": {"id": 1, "triggered_by": "u"},
+        "dataset": {"id": 2, "name": "d"},
+        "agent": {"id": 3, "name": "a", "agent_key": "k", "version": "v"},
+        "run_cases": [{"run_case_id": "not-an-int"}],
+    }
+    with pytest.raises(MessageContractError, match="E_MESSAGE_CONTRACT"):
+        parse_message(payload)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app.status_batcher import CaseStatusBatcher
+
+
+class _DbStub:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.fail = fail
+        self.batches: list[tuple[int, list[tuple[int, str]]]] = []
+        self.flushed = threading.Event()
+
+    def mark_case_statuses(self, *, experiment_id: int, updates: list[tuple[int, str]]) -> None:
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append((experiment_id, list(updates)))
+        self.flushed.set()
+
+
+def test_status_batcher_flushes_pending_updates_in_order_on_exit() -> None:
+    db = _DbStub()
+    with CaseStatusBatcher(db, 7, flush_interval_seconds=60) as batcher:
+        batcher.submit(1, "running")
+        batcher.submit(1, "trajectory")
+        batcher.submit(2, "running")
+
+    assert db.batches == [(7, [(1, "running"), (1, "trajectory"), (2, "running")])]
+
+
+def test_status_batcher_flushes_when_batch_is_full() -> None:
+    db = _DbStub()
+    batcher = CaseStatusBatcher(db, 7, flush_interval_seconds=60, max_batch=2)
+    batcher.submit(1, "running")
+    batcher.submit(2, "running")
+
+    assert db.flushed.wait(timeout=5)
+    assert db.batches == [(7, [(1, "running"), (2, "running")])]
+    batcher.close()
+
+
+def test_status_batcher_logs_flush_error_without_raising(caplog: pytest.LogCaptureFixture) -> None:
+    with CaseStatusBatcher(_DbStub(fail=True), 7) as batcher:
+        batcher.submit(1, "running")
+
+    assert "code=E_CASE_STATUS_FLUSH_FAILED experiment_id=7 updates=1" in caplog.text
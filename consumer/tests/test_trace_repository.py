@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from infrastructure.trace_repository import TraceRepository
+
+
+class _RecordingCursor:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def execute(self, sql: str, params: Any = None) -> None:
+        self.statements.append(" ".join(sql.split()))
+
+    def fetchall(self) -> list[Any]:
+        return []
+
+
+@pytest.mark.parametrize(("engine", "deleted_filter"), [("postgres", "is_deleted = FALSE"), ("mysql", "is_deleted = 0")])
+def test_run_case_session_runs_logs_and_spans_on_one_cursor(engine: str, deleted_filter: str) -> None:
+    repo = TraceRepository(settings=SimpleNamespace(database_engine=engine))  # type: ignore[arg-type]
+    cur = _RecordingCursor()
+    connects: list[str] = []
+
+    @contextmanager
+    def _cursor() -> Iterator[tuple[str, _RecordingCursor]]:
+        connects.append(engine)
+        yield engine, cur
+
+    repo._cursor = _cursor  # type: ignore[method-assign]
+
+    with repo.run_case_session() as traces:
+        assert traces.fetch_logs(run_case_id=7, start_ms=0, end_ms=1) == []
+        assert traces.fetch_spans(run_case_id=7, start_ms=0, end_ms=1) == []
+
+    assert connects == [engine]
+    assert [sql.split(" FROM ")[1].split()[0] for sql in cur.statements] == ["otel_logs", "otel_traces"]
+    assert all(deleted_filter in sql for sql in cur.statements)